@@ -1,4 +1,4 @@
-from fastapi import APIRouter, status
+from fastapi import APIRouter, Request, Response, status
 from pydantic import BaseModel
 from fastapi_simple_rate_limiter import rate_limiter
 router = APIRouter()
@@ -17,4 +17,30 @@ class HealthCheck(BaseModel):
 )
 @rate_limiter(limit=30, seconds=60)
 def health_check(app_version: str = "1.0.0"):
-    return HealthCheck(status="ok", version=app_version)
\ No newline at end of file
+    return HealthCheck(status="ok", version=app_version)
+
+@router.get(
+    "/live",
+    status_code=status.HTTP_200_OK,
+    tags=["Health"],
+    summary="Liveness Probe",
+    description="Returns 200 as soon as the process is serving requests.",
+)
+async def liveness():
+    return {"status": "alive"}
+
+@router.get(
+    "/ready",
+    tags=["Health"],
+    summary="Readiness Probe",
+    description="Returns 503 until the deferred startup work (database checks) has finished, and for good if it failed.",
+)
+async def readiness(request: Request, response: Response):
+    if getattr(request.app.state, "startup_error", None) is not None:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+        return {"status": "failed"}
+    startup_complete = getattr(request.app.state, "startup_complete", None)
+    if startup_complete is not None and not startup_complete.is_set():
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+        return {"status": "starting"}
+    return {"status": "ready"}
@@ -6,6 +6,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime
 from fastapi.responses import StreamingResponse, Response
 import json
+import orjson
 import google.generativeai as genai
 import uuid
 import asyncio
@@ -18,6 +19,7 @@ from src.api.v1.utils import fetch_favicon_bytes
 from src.services.react_agent import AlloyReActAgent
 from src.services.docling import process_document_with_docling
 from src.services.report_generator import generate_chat_response
+from src.services import llm_cache
 from src.services.pdf_generator import create_report_pdf
 from loguru import logger
 from fastapi_simple_rate_limiter import rate_limiter
@@ -25,6 +27,18 @@ from fastapi_simple_rate_limiter import rate_limiter
 router = APIRouter()
 settings = get_settings()
 genai.configure(api_key=settings.GEMINI_API_KEY)
+_gemini_model = genai.GenerativeModel(settings.GEMINI_MODEL_NAME)
+# The key is the whole synthesis prompt, which embeds the gathered data and the template, so a
+# hit can only be the same report; it can be kept as long as the underlying Qloo data.
+SYNTHESIS_CACHE_TTL = 7 * 86400
+# Human-readable names for agent tools in progress events.
+TOOL_LABELS = {
+    "web_search": "web research",
+    "intelligent_cultural_analysis_tool": "cultural analysis",
+    "persona_expansion_tool": "persona expansion",
+    "corporate_culture_tool": "corporate culture research",
+    "financial_and_market_tool": "financial and market research",
+}
 
 # --- Pydantic Models for API ---
 class ReportGeneratePayload(SQLModel):
@@ -97,7 +111,7 @@ async def synthesize_final_report(agent_data: dict) -> dict:
         if key not in ['culture_clashes', 'untapped_growths', 'qloo_analysis', 'persona_expansion']
     }
 
-    model = genai.GenerativeModel(settings.GEMINI_MODEL_NAME)
+    model = _gemini_model
     prompt = f"""
     You are a senior M&A analyst from a top-tier investment bank. You have been provided with raw data from your junior research team.
     Your task is to synthesize this data into professional, qualitative summaries for a due diligence report.
@@ -118,8 +132,18 @@ async def synthesize_final_report(agent_data: dict) -> dict:
     """
     
     try:
-        response = await model.generate_content_async(prompt, generation_config={"response_mime_type": "application/json"})
-        report_from_llm = json.loads(response.text)
+        # Regenerating a report from the same gathered data reuses the earlier synthesis.
+        cache_key = llm_cache.make_key(settings.GEMINI_MODEL_NAME, prompt)
+        cached = await llm_cache.get(cache_key)
+        if cached is not None:
+            logger.debug("Report synthesis served from cache.")
+            response_text = cached
+        else:
+            response = await model.generate_content_async(prompt, generation_config={"response_mime_type": "application/json"})
+            response_text = response.text
+        report_from_llm = orjson.loads(response_text)
+        if cached is None:
+            await llm_cache.put(cache_key, response_text, ttl=SYNTHESIS_CACHE_TTL)
         
         final_report = {
             "cultural_compatibility_score": cultural_score,
@@ -173,6 +197,10 @@ async def generate_full_report_stream(report_id: uuid.UUID, payload: ReportGener
             if raw_status in ["action", "observation", "thinking", "qloo_insight"]: return ""
             event_data = {"payload": data.get("payload")}
             if raw_status == "source": event_data['status'] = 'source'
+            elif raw_status == "summary_chunk": event_data['status'] = 'summary_chunk'; event_data['payload'] = {"query": data.get("query"), "delta": data.get("delta")}
+            elif raw_status == "planned_tool": event_data['status'] = 'planned_tool'; event_data['payload'] = {"tool_name": data.get("tool_name")}; event_data['message'] = f"Next step: {TOOL_LABELS.get(data.get('tool_name'), data.get('tool_name'))}"
+            elif raw_status == "cache_hit": event_data['status'] = 'cache_hit'; event_data['payload'] = {"tool_name": data.get("tool_name")}; event_data['message'] = f"Reusing recent results for {TOOL_LABELS.get(data.get('tool_name'), data.get('tool_name'))}"
+            elif raw_status == "sources_batch": event_data['status'] = 'sources_batch'
             elif raw_status == "thought": event_data['status'] = 'reasoning'; event_data['message'] = data.get("message", "").replace('**Thought**:', '').strip()
             elif raw_status == "complete": return "" 
             elif raw_status == "error": event_data['status'] = 'error'; event_data['message'] = data.get("message")
@@ -184,7 +212,7 @@ async def generate_full_report_stream(report_id: uuid.UUID, payload: ReportGener
                 elif 'financial_and_market' in tool_name: event_data['status'] = 'analysis'; event_data['message'] = f"Analyzing market position of {action_payload.get('parameters', {}).get('brand_name')}"
                 elif 'web_search' in tool_name: event_data['status'] = 'search'; event_data['message'] = f"Researching: {action_payload.get('parameters', {}).get('query')}"
                 else: event_data['status'] = 'info'; event_data['message'] = data.get("message")
-            return f"data: {json.dumps(event_data)}\n\n"
+            return f"data: {orjson.dumps(event_data).decode()}\n\n"
 
         report_to_generate = None
         generation_succeeded = False
@@ -213,7 +241,7 @@ async def generate_full_report_stream(report_id: uuid.UUID, payload: ReportGener
                     yield sse_event
                 # Explicitly pass the qloo_insight event to the frontend
                 if event.get("status") == "qloo_insight":
-                    yield f"data: {json.dumps(event)}\n\n"
+                    yield f"data: {orjson.dumps(event).decode()}\n\n"
                 if event.get("status") == "complete": 
                     break
             
@@ -312,11 +340,13 @@ async def download_report_pdf(report_id: uuid.UUID, session: AsyncSession = Depe
         llm_summary = {
             "strategic_summary": report.analysis.strategic_summary,
             "financial_synthesis": report.analysis.financial_synthesis,
-            "brand_archetypes": json.loads(report.analysis.brand_archetype_summary) if report.analysis.brand_archetype_summary else {},
-            "corporate_ethos": json.loads(report.analysis.corporate_ethos_summary) if report.analysis.corporate_ethos_summary else {}
+            "brand_archetypes": orjson.loads(report.analysis.brand_archetype_summary) if report.analysis.brand_archetype_summary else {},
+            "corporate_ethos": orjson.loads(report.analysis.corporate_ethos_summary) if report.analysis.corporate_ethos_summary else {}
         }
         
-        pdf_bytes = create_report_pdf(
+        # Rendering is synchronous and CPU-bound; a thread keeps other requests' streams moving.
+        pdf_bytes = await asyncio.to_thread(
+            create_report_pdf,
             report, 
             llm_summary,
             acquirer_favicon_bytes,
@@ -382,7 +412,7 @@ async def chat_with_report(report_id: uuid.UUID, payload: ReportChatPayload, ses
     async def stream_response():
         try:
             async for event in generate_chat_response(payload.messages, payload.context, payload.use_grounding):
-                yield f"data: {json.dumps(event)}\n\n"
+                yield f"data: {orjson.dumps(event).decode()}\n\n"
         except Exception as e:
             logger.error(f"Error during chat stream for report {report_id}: {e}")
             error_event = {"type": "error", "payload": "Sorry, I encountered an error while processing your request."}
@@ -13,6 +13,28 @@ from fastapi_simple_rate_limiter import rate_limiter
 router = APIRouter()
 settings = get_settings()
 
+FAVICON_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+}
+# Shared by the favicon endpoint and PDF generation so repeat lookups of a site reuse its connection.
+_favicon_http: Optional[httpx.AsyncClient] = None
+
+def _get_favicon_http() -> httpx.AsyncClient:
+    global _favicon_http
+    if _favicon_http is None or _favicon_http.is_closed:
+        _favicon_http = httpx.AsyncClient(
+            follow_redirects=True,
+            headers=FAVICON_HEADERS,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+        )
+    return _favicon_http
+
+async def close_http_client() -> None:
+    global _favicon_http
+    if _favicon_http is not None:
+        await _favicon_http.aclose()
+        _favicon_http = None
+
 async def fetch_with_scraper(client: httpx.AsyncClient, url: str) -> httpx.Response:
     if not settings.SCRAPER_API_KEY or settings.SCRAPER_API_KEY == "YOUR_SCRAPER_API_KEY_HERE":
         logger.warning("ScraperAPI key not configured. Attempting direct request.")
@@ -66,18 +88,15 @@ async def fetch_favicon_bytes(brand_name: str) -> Optional[bytes]:
         website_url = await find_official_website(brand_name)
         if not website_url:
             return None
-        
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-        }
-        async with httpx.AsyncClient(follow_redirects=True, headers=headers) as client:
-            favicon_url = await find_favicon_url(website_url, client)
-            if not favicon_url:
-                return None
-            
-            response = await client.get(favicon_url, timeout=10)
-            response.raise_for_status()
-            return response.content
+
+        client = _get_favicon_http()
+        favicon_url = await find_favicon_url(website_url, client)
+        if not favicon_url:
+            return None
+
+        response = await client.get(favicon_url, timeout=10)
+        response.raise_for_status()
+        return response.content
     except Exception as e:
         logger.warning(f"Could not fetch favicon bytes for '{brand_name}': {e}")
         return None
@@ -108,18 +127,14 @@ async def get_favicon(
     if not final_url.startswith('http'):
         final_url = 'https://' + final_url
 
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-    }
-    async with httpx.AsyncClient(follow_redirects=True, headers=headers) as client:
-        try:
-            favicon_url = await find_favicon_url(final_url, client)
-            if favicon_url:
-                return RedirectResponse(url=favicon_url)
-            raise HTTPException(status_code=404, detail="Favicon not found for the discovered URL.")
-        except httpx.RequestError as e:
-            logger.warning(f"Could not fetch URL {final_url}: {e}")
-            raise HTTPException(status_code=400, detail=f"Could not fetch the provided URL: {e}")
-        except Exception as e:
-            logger.error(f"An unexpected error occurred while fetching favicon for {final_url}: {e}")
-            raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, detail="An internal error occurred.")
\ No newline at end of file
+    try:
+        favicon_url = await find_favicon_url(final_url, _get_favicon_http())
+        if favicon_url:
+            return RedirectResponse(url=favicon_url)
+        raise HTTPException(status_code=404, detail="Favicon not found for the discovered URL.")
+    except httpx.RequestError as e:
+        logger.warning(f"Could not fetch URL {final_url}: {e}")
+        raise HTTPException(status_code=400, detail=f"Could not fetch the provided URL: {e}")
+    except Exception as e:
+        logger.error(f"An unexpected error occurred while fetching favicon for {final_url}: {e}")
+        raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, detail="An internal error occurred.")
\ No newline at end of file
@@ -21,7 +21,9 @@ class Settings(BaseSettings):
     QLOO_API_KEY: str
     GEMINI_API_KEY: str
     GEMINI_MODEL_NAME: str = "gemini-2.5-pro"
+    AGENT_SPECULATIVE_TOOLS: bool = True
     TAVILY_API_KEY: str
+    TAVILY_CACHE_TTL: int = 3600
     SCRAPER_API_KEY: str
     
     # Google OAuth
@@ -35,8 +37,14 @@ class Settings(BaseSettings):
     POSTGRES_MAX_OVERFLOW: int = 5
     POSTGRES_POOL_TIMEOUT: int = 30
     POSTGRES_POOL_RECYCLE: int = 1800
+    # pre_ping costs a round trip per checkout but catches connections dropped by the
+    # server or a proxy; turn it off only where pool_recycle already stays below their idle timeout.
+    POSTGRES_POOL_PRE_PING: bool = True
     POSTGRES_USE_SSL: bool = True
 
+    # Cache (optional; falls back to an in-process cache when unset)
+    REDIS_URL: str | None = None
+
     # CORS & Frontend
     CORS_ORIGINS: list[str]
 
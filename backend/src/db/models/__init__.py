@@ -3,6 +3,7 @@ import enum
 from typing import List, Optional, Dict, Any
 from datetime import datetime, timezone 
 import uuid 
+from functools import cache
 from sqlmodel import Field, SQLModel, Relationship as SQLModelRelationship
 from sqlalchemy.orm import relationship
 from sqlalchemy import Column, DateTime, func, TEXT, JSON, ForeignKey # Import ForeignKey
@@ -177,10 +178,12 @@ class ReportRead(SQLModel):
     culture_clashes: List[CultureClashRead] = []
     untapped_growths: List[UntappedGrowthRead] = []
 
+@cache
 def rebuild_all_models():
     """
     This function forces the resolution of all forward-looking type hints
-    in SQLModel and Pydantic models.
+    in SQLModel and Pydantic models. The result lives on the model classes,
+    so later calls in the same process (app reloads, test clients) are no-ops.
     """
     logger.info("Rebuilding all model forward references...")
     User.model_rebuild()
@@ -196,6 +199,10 @@ def rebuild_all_models():
     ReportRead.model_rebuild()
     logger.success("Model forward references rebuilt successfully.")
 
+# Resolve at import so forked workers (e.g. gunicorn --preload) inherit the finished models
+# instead of each rebuilding them at startup.
+rebuild_all_models()
+
 __all__ = [
     "User", "Report", "ReportAnalysis", "CultureClash", "UntappedGrowth",
     "ReportStatus", "ClashSeverity",
@@ -47,16 +47,26 @@ class PostgresDatabase:
             # Explicitly disable SSL
             connect_args["ssl"] = False
         
-        # CORE FIX: In a development environment, prepared statement caching can cause
-        # errors when the schema changes during hot-reloading (e.g., dropping and
-        # recreating tables on startup). Disabling the cache for asyncpg resolves this.
-        if settings.ENVIRONMENT == "development":
+        # CORE FIX: In development and test environments, prepared statement caching can
+        # cause errors when the schema changes under pooled connections (e.g., dropping and
+        # recreating tables on startup or per test run). Disabling both asyncpg's cache and
+        # SQLAlchemy's prepared statement cache resolves this without flushing the pool.
+        if settings.ENVIRONMENT in ("development", "test"):
             # The value 0 disables the cache.
             connect_args["statement_cache_size"] = 0
+            connect_args["prepared_statement_cache_size"] = 0
             logger.warning(
                 "DEV MODE: Disabling prepared statement cache to prevent schema change errors."
             )
 
+        server_settings: Dict[str, str] = {}
+        # Pin every pooled connection to the configured schema, so DDL run outside
+        # get_session (create_all, test fixtures) lands in the same place as queries.
+        if self.schema != "public":
+            server_settings["search_path"] = f"{self.schema}, public"
+        connect_args["server_settings"] = server_settings
+        connect_args["timeout"] = 10
+
         self.pool_size = settings.POSTGRES_POOL_SIZE
         self.max_overflow = settings.POSTGRES_MAX_OVERFLOW
         self.pool_timeout = settings.POSTGRES_POOL_TIMEOUT
@@ -73,7 +83,7 @@ class PostgresDatabase:
                 max_overflow=self.max_overflow,
                 pool_timeout=self.pool_timeout, 
                 pool_recycle=self.pool_recycle, 
-                pool_pre_ping=True, 
+                pool_pre_ping=settings.POSTGRES_POOL_PRE_PING, 
                 connect_args=connect_args
             )
             self.async_session_maker = sessionmaker(self.engine, class_=AsyncSession, expire_on_commit=False)
@@ -85,8 +95,9 @@ class PostgresDatabase:
     async def create_db_and_tables(self):
         """
         Initializes database tables. For development, it drops and recreates tables
-        to ensure the schema is always in sync with the models. For production,
-        it creates tables if they don't exist, but does not perform migrations.
+        to ensure the schema is always in sync with the models. Elsewhere, it skips
+        table creation when every mapped table already exists and otherwise creates
+        the missing ones; it never alters existing tables or performs migrations.
         """
         retries = 0
         last_error = None
@@ -94,6 +105,17 @@ class PostgresDatabase:
             try:
                 logger.info(f"Attempting to connect to database (attempt {retries + 1})")
                 async with self.engine.begin() as conn:
+                    if settings.ENVIRONMENT != "development":
+                        # One catalog query instead of create_all's per-table checks.
+                        tables = [f"{table.schema or self.schema}.{table.name}" for table in SQLModel.metadata.sorted_tables]
+                        all_present = await conn.scalar(
+                            text("SELECT bool_and(to_regclass(name) IS NOT NULL) FROM unnest(CAST(:tables AS text[])) AS name"),
+                            {"tables": tables},
+                        )
+                        if all_present:
+                            logger.success("All database tables exist; skipping table creation.")
+                            return True
+
                     # Ensure the schema exists
                     await conn.execute(text(f"CREATE SCHEMA IF NOT EXISTS {self.schema}"))
                     
@@ -3,9 +3,10 @@ from fastapi.middleware.cors import CORSMiddleware
 
 from src.core.settings import get_settings
 from src.api.v1 import router as api_router
-from src.utils import lifespan
+from src.utils import lifespan, setup_logging
 
 settings = get_settings()
+setup_logging()
 
 # --- FastAPI App Initialization ---
 app = FastAPI(
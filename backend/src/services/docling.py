@@ -3,6 +3,35 @@ from loguru import logger
 import openpyxl # type: ignore
 from pypdf import PdfReader
 import io
+import asyncio
+
+def _extract_text(file_bytes: bytes, content_type: str | None) -> str:
+    """Extracts text from the raw file bytes. Synchronous and CPU-bound."""
+    text_content = ""
+    if content_type == "application/pdf":
+        reader = PdfReader(io.BytesIO(file_bytes))
+        for page in reader.pages:
+            text_content += page.extract_text() or ""
+    
+    elif content_type in ["application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", "application/vnd.ms-excel"]:
+        workbook = openpyxl.load_workbook(io.BytesIO(file_bytes), data_only=True)
+        for sheet_name in workbook.sheetnames:
+            sheet = workbook[sheet_name]
+            text_content += f"\n--- Sheet: {sheet_name} ---\n"
+            for row in sheet.iter_rows():
+                row_text = "\t".join([str(cell.value) if cell.value is not None else "" for cell in row])
+                text_content += row_text + "\n"
+
+    elif content_type in ["text/plain", "text/markdown"]:
+        text_content = file_bytes.decode("utf-8", errors="ignore")
+
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail=f"Unsupported file type: {content_type}. Please upload PDF, Excel, TXT, or MD files."
+        )
+
+    return text_content
 
 async def process_document_with_docling(file: UploadFile) -> str:
     """
@@ -13,32 +42,10 @@ async def process_document_with_docling(file: UploadFile) -> str:
     logger.info(f"Processing file '{file.filename}' with content type: {content_type}")
     
     file_bytes = await file.read()
-    text_content = ""
     
     try:
-        if content_type == "application/pdf":
-            reader = PdfReader(io.BytesIO(file_bytes))
-            for page in reader.pages:
-                text_content += page.extract_text() or ""
-        
-        elif content_type in ["application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", "application/vnd.ms-excel"]:
-            workbook = openpyxl.load_workbook(io.BytesIO(file_bytes), data_only=True)
-            for sheet_name in workbook.sheetnames:
-                sheet = workbook[sheet_name]
-                text_content += f"\n--- Sheet: {sheet_name} ---\n"
-                for row in sheet.iter_rows():
-                    row_text = "\t".join([str(cell.value) if cell.value is not None else "" for cell in row])
-                    text_content += row_text + "\n"
-
-        elif content_type in ["text/plain", "text/markdown"]:
-            text_content = file_bytes.decode("utf-8", errors="ignore")
-
-        else:
-            raise HTTPException(
-                status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
-                detail=f"Unsupported file type: {content_type}. Please upload PDF, Excel, TXT, or MD files."
-            )
-            
+        # PDF and spreadsheet parsing can take seconds on large uploads; keep it off the event loop.
+        text_content = await asyncio.to_thread(_extract_text, file_bytes, content_type)
         logger.success(f"Successfully extracted text from '{file.filename}'.")
         return text_content.strip()
 
@@ -0,0 +1,84 @@
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+import redis.asyncio as redis
+from loguru import logger
+
+from src.core.settings import get_settings
+
+settings = get_settings()
+
+KEY_PREFIX = "alloy:llm:"
+DEFAULT_TTL = 3600
+LOCAL_MAX_ENTRIES = 1024
+# Every cached LLM, search and Qloo call checks Redis first, so a hung Redis must degrade
+# to a cache miss quickly rather than stall the request.
+REDIS_SOCKET_TIMEOUT = 0.25
+REDIS_CONNECT_TIMEOUT = 0.5
+
+_redis: Optional[redis.Redis] = None
+# In-process fallback used when REDIS_URL is not configured: key -> (expires_at, value).
+_local: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+
+
+def make_key(*parts: str) -> str:
+    """Builds an exact-match cache key from the model name and prompt parts."""
+    return hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()
+
+
+def _get_redis() -> Optional[redis.Redis]:
+    global _redis
+    if _redis is None and settings.REDIS_URL:
+        _redis = redis.from_url(
+            settings.REDIS_URL,
+            decode_responses=True,
+            socket_timeout=REDIS_SOCKET_TIMEOUT,
+            socket_connect_timeout=REDIS_CONNECT_TIMEOUT,
+        )
+    return _redis
+
+
+async def get(key: str) -> Optional[str]:
+    """Returns the cached value for `key`, or None on a miss or cache failure."""
+    client = _get_redis()
+    if client is not None:
+        try:
+            return await client.get(KEY_PREFIX + key)
+        except redis.RedisError as e:
+            logger.warning(f"LLM cache read failed, treating as miss: {e}")
+            return None
+
+    entry = _local.get(key)
+    if entry is None:
+        return None
+    expires_at, value = entry
+    if expires_at < time.monotonic():
+        del _local[key]
+        return None
+    _local.move_to_end(key)
+    return value
+
+
+async def put(key: str, value: str, ttl: int = DEFAULT_TTL) -> None:
+    """Stores `value` under `key` for `ttl` seconds. Failures are logged and ignored."""
+    client = _get_redis()
+    if client is not None:
+        try:
+            await client.setex(KEY_PREFIX + key, ttl, value)
+        except redis.RedisError as e:
+            logger.warning(f"LLM cache write failed: {e}")
+        return
+
+    _local[key] = (time.monotonic() + ttl, value)
+    _local.move_to_end(key)
+    while len(_local) > LOCAL_MAX_ENTRIES:
+        _local.popitem(last=False)
+
+
+async def close() -> None:
+    global _redis
+    if _redis is not None:
+        await _redis.aclose()
+        _redis = None
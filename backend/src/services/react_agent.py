@@ -1,74 +1,234 @@
 import httpx
 import google.generativeai as genai
-from typing import List, Dict, Any, AsyncGenerator, Optional, Tuple, Set
+from google.api_core import exceptions as google_exceptions
+from tenacity import RetryCallState, retry, retry_if_exception_type, stop_after_attempt, wait_exponential_jitter
+from typing import List, Dict, Any, AsyncGenerator, AsyncIterator, Awaitable, Callable, FrozenSet, Iterable, Optional, Tuple, Set, Deque
 from loguru import logger
 import json
+import orjson
+import re
 import asyncio
+import heapq
+import math
+import operator
+from contextvars import ContextVar
+from collections import Counter, OrderedDict, deque
+from functools import lru_cache
+import time
+import sys
+import textwrap
+from email.utils import parsedate_to_datetime
 
 from src.core.settings import get_settings
-from src.services.search import web_search
+from src.services.search import web_search, TavilySearchToolOutput
+from src.services import llm_cache
 
 settings = get_settings()
+_loads = orjson.loads
+
+def _dumps(obj: Any) -> str:
+    return orjson.dumps(obj).decode()
+
+# Observations above this size are parsed in a worker thread to keep the event loop responsive.
+OFFLOOP_PARSE_THRESHOLD = 64 * 1024
+
+async def _loads_offloop(text: str) -> Any:
+    if isinstance(text, str) and len(text) > OFFLOOP_PARSE_THRESHOLD:
+        return await asyncio.get_running_loop().run_in_executor(None, orjson.loads, text)
+    return _loads(text)
+
+async def _load_analysis(observation: str) -> Dict[str, Any]:
+    """Parses an analysis tool's observation, rejecting anything that is not a JSON object."""
+    analysis = await _loads_offloop(observation)
+    if not isinstance(analysis, dict):
+        raise TypeError(f"expected a JSON object, got {type(analysis).__name__}")
+    return analysis
+
 genai.configure(api_key=settings.GEMINI_API_KEY)
+@lru_cache(maxsize=8)
+def _get_model(model_name: str, system_instruction: Optional[str] = None) -> genai.GenerativeModel:
+    """Returns a shared model wrapper per (model, system instruction), so agents and helpers reuse one client."""
+    return genai.GenerativeModel(model_name, system_instruction=system_instruction)
+
+_gemini_model = _get_model(settings.GEMINI_MODEL_NAME)
 
 # --- Agent Tool Helpers ---
 
+# Set by AlloyReActAgent while a tool runs, so summary deltas can be streamed to the client.
+_summary_stream: ContextVar[Optional[asyncio.Queue]] = ContextVar("_summary_stream", default=None)
+# Set by AlloyReActAgent while the planner runs, so its tokens and chosen tool reach the client early.
+_planner_stream: ContextVar[Optional[asyncio.Queue]] = ContextVar("_planner_stream", default=None)
+# Set by AlloyReActAgent's planner loop: web searches return their raw results right away and
+# summarize in the background, so the summary overlaps the next planner call.
+_defer_summaries: ContextVar[bool] = ContextVar("_defer_summaries", default=False)
+_PLANNED_TOOL_RE = re.compile(r'"tool_name"\s*:\s*"([^"]+)"')
+# Matches the planner's "thought" once its whole JSON string literal (escapes included) has arrived.
+_PLANNED_THOUGHT_RE = re.compile(r'"thought"\s*:\s*("(?:[^"\\]|\\.)*")')
+
+# Summaries and proxy lists are deterministic for a given prompt, so reruns of the same
+# deal (or other deals sharing a brand) reuse them from llm_cache.
+LLM_HELPER_CACHE_TTL = 86400
+
+SUMMARY_INSTRUCTIONS = textwrap.dedent("""
+    Based *only* on the text from a web search provided in the request, provide a concise summary that directly answers the user's query.
+    Focus on the most relevant facts, entities, and data points.
+    """).strip()
+
+# Upper bound on the search context sent for summarization; Tavily's advanced depth can return
+# long page extracts, and past this the summary gains little while the prompt keeps growing.
+SUMMARY_MAX_CONTEXT_CHARS = 30000
+# Below this the search context is already compact enough for the agent to use as-is.
+SUMMARY_MIN_CONTEXT_CHARS = 1500
+
+# Malformed planner output is logged for debugging; beyond this the rest of it is noise that
+# only slows the log pipeline.
+LOG_RAW_RESPONSE_CHARS = 2000
+
+def _summary_prompt(context: str, query: str) -> str:
+    if len(context) > SUMMARY_MAX_CONTEXT_CHARS:
+        context = context[:SUMMARY_MAX_CONTEXT_CHARS]
+    return f"""
+    USER QUERY: "{query}"
+
+    SEARCH RESULTS CONTEXT:
+    ---
+    {context}
+    ---
+
+    CONCISE SUMMARY FOR AGENT:
+    """
+
+async def _summarize_with_gemini_streaming(prompt: str) -> AsyncGenerator[str, None]:
+    """Streams a Gemini summary for a prepared summary prompt; the fixed instructions go as the system instruction."""
+    model = _get_model(settings.GEMINI_MODEL_NAME, SUMMARY_INSTRUCTIONS)
+    response_stream = await model.generate_content_async(prompt, stream=True)
+    async for chunk in response_stream:
+        yield chunk.text
+
+SUMMARY_UNAVAILABLE = "Could not summarize the search results due to an internal error."
+
+# Summaries being generated right now, so concurrent identical requests (e.g. two reports on
+# the same brand) share one Gemini call instead of racing to fill llm_cache.
+_summary_inflight: "OrderedDict[str, Tuple[float, asyncio.Future]]" = OrderedDict()
+
 async def _summarize_with_gemini(context: str, query: str) -> str:
     """Summarizes a text context using Gemini, tailored to a specific query."""
     if not context.strip():
         return "No information found from web search."
+    sink = _summary_stream.get()
+    if len(context) < SUMMARY_MIN_CONTEXT_CHARS:
+        if sink is not None:
+            sink.put_nowait((query, context))
+        return context
+    prompt = _summary_prompt(context, query)
+    cache_key = llm_cache.make_key(settings.GEMINI_MODEL_NAME, SUMMARY_INSTRUCTIONS, prompt)
+    cached = await llm_cache.get(cache_key)
+    if cached is not None:
+        if sink is not None:
+            sink.put_nowait((query, cached))
+        return cached
+    joining = cache_key in _summary_inflight
+    summary = await _single_flight(_summary_inflight, cache_key, lambda: _generate_summary(prompt, query, sink, cache_key), keep_results=False)
+    if joining and sink is not None:
+        # Only the first caller's client saw the deltas; a joiner gets the summary in one piece.
+        sink.put_nowait((query, summary))
+    return summary
+
+async def _generate_summary(prompt: str, query: str, sink: Optional[asyncio.Queue], cache_key: str) -> str:
     try:
-        model = genai.GenerativeModel(settings.GEMINI_MODEL_NAME)
-        prompt = f"""
-        Based *only* on the following text from a web search, provide a concise summary that directly answers the user's query.
-        Focus on the most relevant facts, entities, and data points.
-
-        USER QUERY: "{query}"
-
-        SEARCH RESULTS CONTEXT:
-        ---
-        {context}
-        ---
-
-        CONCISE SUMMARY FOR AGENT:
-        """
-        response = await model.generate_content_async(prompt)
-        return response.text.strip()
+        chunks = []
+        async for delta in _summarize_with_gemini_streaming(prompt):
+            chunks.append(delta)
+            if sink is not None:
+                sink.put_nowait((query, delta))
+        summary = "".join(chunks).strip()
     except Exception as e:
         logger.error(f"Error during Gemini summarization: {e}")
-        return "Could not summarize the search results due to an internal error."
-
-async def _extract_cultural_proxies(context: str, brand_name: str) -> List[str]:
-    """Uses an LLM to identify 3-5 key cultural products/properties from a text."""
-    logger.info(f"Extracting cultural proxies for {brand_name}...")
-    if not context.strip():
+        return SUMMARY_UNAVAILABLE
+    if summary:
+        await llm_cache.put(cache_key, summary, ttl=LLM_HELPER_CACHE_TTL)
+    return summary
+
+PROXY_EXTRACTION_INSTRUCTIONS = textwrap.dedent("""
+    The request contains two brands, an ACQUIRER and a TARGET, each with candidate names extracted from web search text about it (most frequent first).
+    For each brand, choosing *only* from that brand's candidates, identify the 3 to 5 most famous and culturally significant **named entities** associated with it.
+    Focus on concrete, searchable items:
+    - Specific products (e.g., "iPhone 15", "Air Jordan", "Model S")
+    - Hit movies, TV shows, or video games (e.g., "Stranger Things", "Call of Duty")
+    - Famous public figures or spokespeople (e.g., "Michael Jordan", "Taylor Swift")
+    - Well-known sub-brands (e.g., "Pixar", "Marvel Studios")
+
+    Do NOT return abstract concepts like "innovation" or "brand loyalty".
+
+    Return a single JSON object with an "acquirer" and a "target" array of strings. Use an empty array for a brand with no specific items.
+    Example: {"acquirer": ["Famous Product A", "Popular Show B"], "target": ["Sub-brand C"]}
+    """).strip()
+
+# Below this many words a search context is an error/"no results" message, not worth a Gemini call.
+PROXY_MIN_CONTEXT_WORDS = 30
+PROXY_MAX_CANDIDATES = 60
+# Capitalized phrases of up to four words on one line, including "iPhone"-style names and model numbers.
+_NAMED_ENTITY_RE = re.compile(r"\b(?:[A-Z][\w'&-]*|i[A-Z][\w'-]*)(?:[ \t]+(?:[A-Z][\w'&-]*|i[A-Z][\w'-]*|\d+)){0,3}")
+_CANDIDATE_STOPWORDS = frozenset({
+    "A", "An", "And", "As", "At", "But", "By", "For", "From", "In", "It", "Its",
+    "On", "Our", "The", "These", "This", "That", "We", "With",
+})
+
+# The "Title: …\nURL: …\nContent: …" scaffolding of a search context (see search.py): the
+# labels and URLs are dropped so they don't crowd out real names.
+_SEARCH_CONTEXT_LABELS_RE = re.compile(r"^(?:URL:.*$|(?:Title|Content):)", re.MULTILINE)
+
+def _entity_candidates(context: str, brand_name: str) -> List[str]:
+    """Cheap named-entity pass so Gemini only ranks candidate names instead of reading the whole context."""
+    context = _SEARCH_CONTEXT_LABELS_RE.sub("", context)
+    if len(context.split()) < PROXY_MIN_CONTEXT_WORDS:
         return []
-    try:
-        model = genai.GenerativeModel(settings.GEMINI_MODEL_NAME)
-        prompt = f"""
-        Based *only* on the provided text about '{brand_name}', identify the 3 to 5 most famous and culturally significant **named entities** associated with them.
-        Focus on concrete, searchable items:
-        - Specific products (e.g., "iPhone 15", "Air Jordan", "Model S")
-        - Hit movies, TV shows, or video games (e.g., "Stranger Things", "Call of Duty")
-        - Famous public figures or spokespeople (e.g., "Michael Jordan", "Taylor Swift")
-        - Well-known sub-brands (e.g., "Pixar", "Marvel Studios")
-
-        Do NOT return abstract concepts like "innovation" or "brand loyalty".
-
-        CONTEXT:
-        ---
-        {context}
-        ---
-
-        Return a single JSON array of strings. If no specific items are found, return an empty array. Example: ["Famous Product A", "Popular Show B"]
+    brand = _normalize_term(brand_name)
+    counts: Counter = Counter()
+    for match in _NAMED_ENTITY_RE.finditer(context):
+        first, _, rest = match.group(0).partition(" ")
+        # Sentence-initial words ("The", "In") are capitalized too; keep only what follows them.
+        name = rest if first in _CANDIDATE_STOPWORDS else match.group(0)
+        if name and _normalize_term(name) != brand:
+            counts[name] += 1
+    return [name for name, _ in counts.most_common(PROXY_MAX_CANDIDATES)]
+
+def _proxy_list(value: Any) -> List[str]:
+    return [item for item in value if isinstance(item, str)] if isinstance(value, list) else []
+
+async def _extract_cultural_proxies_pair(acquirer_context: str, acquirer_name: str, target_context: str, target_name: str) -> Tuple[List[str], List[str]]:
+    """Uses one LLM call to identify 3-5 key cultural products/properties for each brand."""
+    logger.info(f"Extracting cultural proxies for {acquirer_name} and {target_name}...")
+    acquirer_candidates = _entity_candidates(acquirer_context, acquirer_name)
+    target_candidates = _entity_candidates(target_context, target_name)
+    if not acquirer_candidates and not target_candidates:
+        return [], []
+    prompt = f"""
+        ACQUIRER BRAND: '{acquirer_name}'
+        ACQUIRER CANDIDATES: {_dumps(acquirer_candidates)}
+
+        TARGET BRAND: '{target_name}'
+        TARGET CANDIDATES: {_dumps(target_candidates)}
         """
+    cache_key = llm_cache.make_key(settings.GEMINI_MODEL_NAME, PROXY_EXTRACTION_INSTRUCTIONS, prompt)
+    cached = await llm_cache.get(cache_key)
+    if cached is not None:
+        proxies = _loads(cached)
+        return proxies["acquirer"], proxies["target"]
+    model = _get_model(settings.GEMINI_MODEL_NAME, PROXY_EXTRACTION_INSTRUCTIONS)
+    try:
         response = await model.generate_content_async(prompt, generation_config={"response_mime_type": "application/json"})
-        proxies = json.loads(response.text)
-        logger.success(f"Extracted proxies for {brand_name}: {proxies}")
-        return proxies
+        parsed = _loads(response.text)
     except Exception as e:
-        logger.error(f"Error during cultural proxy extraction for {brand_name}: {e}")
-        return []
+        logger.error(f"Error during cultural proxy extraction for {acquirer_name} and {target_name}: {e}")
+        return [], []
+    if not isinstance(parsed, dict):
+        logger.error(f"Cultural proxy extraction returned {type(parsed).__name__}, expected an object.")
+        return [], []
+    proxies = {"acquirer": _proxy_list(parsed.get("acquirer")), "target": _proxy_list(parsed.get("target"))}
+    logger.success(f"Extracted proxies for {acquirer_name}: {proxies['acquirer']}; {target_name}: {proxies['target']}")
+    await llm_cache.put(cache_key, _dumps(proxies), ttl=LLM_HELPER_CACHE_TTL)
+    return proxies["acquirer"], proxies["target"]
 
 
 # --- CORRECTED QLOO API FUNCTIONS ---
@@ -86,89 +246,387 @@ QLOO_ENTITY_TYPE_LIST = [
     "urn:entity:place",
     "urn:entity:destination",
 ]
+# Request pieces that are the same for every Qloo call, built once instead of per lookup.
+_QLOO_HEADERS = {"x-api-key": settings.QLOO_API_KEY}
+_QLOO_ALL_ENTITY_TYPES = ",".join(QLOO_ENTITY_TYPE_LIST)
+_QLOO_TASTE_PARAMS = {"filter.type": "urn:tag"}
+
+# Qloo requests all hit one host, so HTTP/2 lets them multiplex over a single
+# connection; HTTP/1.1 stays enabled as the ALPN fallback.
+QLOO_TIMEOUT = httpx.Timeout(connect=10.0, read=30.0, write=10.0, pool=30.0)
+QLOO_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=100, keepalive_expiry=60)
+# Per-tool cap on in-flight Qloo lookups; with HTTP/2 these share one connection.
+QLOO_MAX_CONCURRENCY = 10
+
+# Created on first use and kept for the life of the process, so TLS handshakes to Qloo
+# are paid once instead of once per tool call; closed from the app lifespan.
+_qloo_http: Optional[httpx.AsyncClient] = None
+
+def _get_qloo_client() -> httpx.AsyncClient:
+    global _qloo_http
+    if _qloo_http is None or _qloo_http.is_closed:
+        _qloo_http = httpx.AsyncClient(http2=True, limits=QLOO_LIMITS, timeout=QLOO_TIMEOUT)
+    return _qloo_http
+
+async def close_http_client() -> None:
+    global _qloo_http
+    if _qloo_http is not None:
+        await _qloo_http.aclose()
+        _qloo_http = None
+
+# Qloo rate-limit state, refreshed from the headers of every Qloo response so that
+# requests are only paced when the server says the bucket is nearly empty.
+QLOO_RATE_LIMIT_LOW_WATERMARK = 3
+QLOO_DEFAULT_RETRY_AFTER = 2.0
+QLOO_FALLBACK_PACING = 0.5
+_qloo_rate_limit: Dict[str, float] = {"remaining": math.inf, "reset_at": 0.0}
+
+def _qloo_retry_after(resp: httpx.Response) -> float:
+    """Parses a Retry-After header (delta-seconds or HTTP-date) into seconds to wait."""
+    value = resp.headers.get("Retry-After")
+    if not value:
+        return QLOO_DEFAULT_RETRY_AFTER
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return QLOO_DEFAULT_RETRY_AFTER
+
+def _record_qloo_rate_limit(resp: httpx.Response) -> None:
+    """Updates the shared Qloo rate-limit state from a response's headers."""
+    remaining = resp.headers.get("X-RateLimit-Remaining")
+    if remaining is not None:
+        try:
+            _qloo_rate_limit["remaining"] = float(remaining)
+        except ValueError:
+            pass
+    if resp.status_code == 429:
+        _qloo_rate_limit["remaining"] = 0
+        _qloo_rate_limit["reset_at"] = time.monotonic() + _qloo_retry_after(resp)
+
+async def _qloo_backpressure() -> None:
+    """Waits before a Qloo request only when the rate-limit bucket is running low."""
+    if _qloo_rate_limit["remaining"] >= QLOO_RATE_LIMIT_LOW_WATERMARK:
+        return
+    reset_at = _qloo_rate_limit["reset_at"]
+    if not reset_at:
+        # Without a known reset time, fall back to the old fixed pacing.
+        await asyncio.sleep(QLOO_FALLBACK_PACING)
+        return
+    delay = reset_at - time.monotonic()
+    if delay > 0:
+        await asyncio.sleep(delay)
+    # The window a 429 announced is over. Qloo may not send X-RateLimit-Remaining, so
+    # don't let the 429's empty bucket pace every later request.
+    _qloo_rate_limit["remaining"] = math.inf
+    _qloo_rate_limit["reset_at"] = 0.0
+
+class _QlooRateLimited(Exception):
+    pass
+
+def _log_qloo_retry(retry_state: RetryCallState) -> None:
+    logger.warning(f"Rate limited by Qloo (attempt {retry_state.attempt_number}), retrying: {retry_state.outcome.exception()}")
+
+# A 429 resets the shared bucket, so the retry's own _qloo_backpressure() waits out
+# Retry-After; the jittered wait here only spreads the retries of concurrent lookups.
+@retry(
+    retry=retry_if_exception_type(_QlooRateLimited),
+    wait=wait_exponential_jitter(multiplier=0.5, max=4),
+    stop=stop_after_attempt(3),
+    before_sleep=_log_qloo_retry,
+    reraise=True,
+)
+async def _qloo_get(client: httpx.AsyncClient, path: str, params: Dict[str, Any], timeout: float) -> httpx.Response:
+    """GETs a Qloo endpoint, pacing on the shared rate-limit state and retrying 429s."""
+    await _qloo_backpressure()
+    resp = await client.get(f"{QLOO_HACKATHON_BASE_URL}{path}", params=params, headers=_QLOO_HEADERS, timeout=timeout)
+    _record_qloo_rate_limit(resp)
+    if resp.status_code == 429:
+        raise _QlooRateLimited(f"{path} returned 429")
+    return resp
+
+_CORPORATE_SUFFIX_RE = re.compile(r"[\s,]+(inc|corp|corporation|co|company|ltd|llc|plc|group)\.?$", re.IGNORECASE)
+
+def _normalize_term(term: str) -> str:
+    """Canonical form of a brand/search term: trimmed, corporate suffix dropped, casefolded."""
+    return _CORPORATE_SUFFIX_RE.sub("", " ".join(term.split())).casefold()
+
+def _dedupe_search_terms(terms: List[str]) -> List[str]:
+    """
+    Removes near-duplicate Qloo search terms ("Apple", "apple", "Apple Inc.") while
+    preserving order, so each distinct entity only costs one ID + tastes lookup.
+    """
+    seen: Dict[str, str] = {}
+    for term in terms:
+        if not isinstance(term, str) or not term.strip():
+            continue
+        seen.setdefault(_normalize_term(term), term.strip())
+    return list(seen.values())
+
+# Process-wide single-flight caches: concurrent and later callers for the same key share one
+# request. Entries expire after a day and the oldest go first beyond the size bound; callers
+# that pass keep_results=False only share the request while it is in flight.
+SINGLE_FLIGHT_CACHE_SIZE = 1024
+SINGLE_FLIGHT_TTL = 86400
+
+async def _single_flight(cache: "OrderedDict[Any, Tuple[float, asyncio.Future]]", key: Any, fetch: Callable[[], Awaitable[Any]], keep_results: bool = True) -> Any:
+    entry = cache.get(key)
+    if entry is not None and entry[0] < time.monotonic():
+        del cache[key]
+        entry = None
+    if entry is None:
+        future = asyncio.ensure_future(fetch())
+        cache[key] = (time.monotonic() + SINGLE_FLIGHT_TTL, future)
+
+        def _evict_if_unsuccessful(done: asyncio.Future) -> None:
+            unsuccessful = done.cancelled() or done.exception() is not None or not done.result()
+            current = cache.get(key)
+            if (unsuccessful or not keep_results) and current is not None and current[1] is done:
+                del cache[key]
+
+        future.add_done_callback(_evict_if_unsuccessful)
+        while len(cache) > SINGLE_FLIGHT_CACHE_SIZE:
+            cache.popitem(last=False)
+    else:
+        future = entry[1]
+        cache.move_to_end(key)
+    # Shielded so one caller being cancelled does not cancel the lookup for the others.
+    return await asyncio.shield(future)
+
+# Qloo lookups: callers resolving the same brands (e.g. the cultural analysis and persona tools)
+# share one request per term/ID. Only successful lookups are kept, so failures are refetched,
+# and only for SINGLE_FLIGHT_TTL, so stale IDs are too.
+_qloo_id_lookups: "OrderedDict[str, Tuple[float, asyncio.Future]]" = OrderedDict()
+_qloo_taste_lookups: "OrderedDict[str, Tuple[float, asyncio.Future]]" = OrderedDict()
 
 async def _find_qloo_id(client: httpx.AsyncClient, entity_name: str) -> Optional[str]:
+    return await _single_flight(_qloo_id_lookups, _normalize_term(entity_name), lambda: _fetch_qloo_id(client, entity_name))
+
+async def _get_tastes_for_entity(client: httpx.AsyncClient, qloo_id: str) -> FrozenSet[str]:
+    # Frozen, so the cached set is shared with every caller without a defensive copy.
+    return await _single_flight(_qloo_taste_lookups, qloo_id, lambda: _load_tastes_for_entity(client, qloo_id))
+
+# Qloo insights for an entity change over days or weeks, so taste sets are also kept in the
+# shared llm_cache (Redis when configured) and survive restarts and other workers.
+QLOO_INSIGHTS_CACHE_TTL = 604800
+
+async def _load_tastes_for_entity(client: httpx.AsyncClient, qloo_id: str) -> FrozenSet[str]:
+    cache_key = llm_cache.make_key("qloo-insights", qloo_id)
+    cached = await llm_cache.get(cache_key)
+    if cached is not None:
+        return frozenset(sys.intern(name) for name in _loads(cached))
+    tastes = await _fetch_tastes_for_entity(client, qloo_id)
+    if tastes:
+        await llm_cache.put(cache_key, _dumps(sorted(tastes)), ttl=QLOO_INSIGHTS_CACHE_TTL)
+    return tastes
+
+_QLOO_ENTITY_TYPE_RANK = {entity_type: rank for rank, entity_type in enumerate(QLOO_ENTITY_TYPE_LIST)}
+
+def _qloo_type_rank(result: Dict[str, Any]) -> int:
+    types = result.get("types") or [result.get("type")]
+    return min((_QLOO_ENTITY_TYPE_RANK.get(t, len(QLOO_ENTITY_TYPE_LIST)) for t in types), default=len(QLOO_ENTITY_TYPE_LIST))
+
+def _first_qloo_id(resp: httpx.Response) -> Optional[str]:
     """
-    Correctly uses the /search endpoint to find a Qloo entity ID by searching
-    across supported types individually until a match is found.
+    The ID of the result whose type comes first in QLOO_ENTITY_TYPE_LIST (the brand over a
+    movie or place of the same name), keeping Qloo's relevance order between equal types.
     """
-    headers = {"x-api-key": settings.QLOO_API_KEY}
-    
-    for entity_type in QLOO_ENTITY_TYPE_LIST:
-        params = {"query": entity_name, "types": entity_type}
+    results = _loads(resp.content).get("results", [])
+    return min(results, key=_qloo_type_rank).get("id") if results else None
+
+async def _fetch_qloo_id(client: httpx.AsyncClient, entity_name: str) -> Optional[str]:
+    """
+    Finds a Qloo entity ID with one /search request across all supported types, retrying
+    once title-cased on an empty result ("air jordan" -> "Air Jordan"). Only if a request
+    fails are the types searched individually, all at once; a request still rate limited
+    after its retries gives up instead, since nine more requests would only make it worse.
+    """
+    entity_name = " ".join(entity_name.split())
+    try:
+        for query in dict.fromkeys((entity_name, entity_name.title())):
+            resp = await _qloo_get(client, "/search", {"query": query, "types": _QLOO_ALL_ENTITY_TYPES}, timeout=10.0)
+            if resp.status_code != 200:
+                logger.warning(f"Qloo multi-type /search for '{query}' failed with status {resp.status_code}; searching per type.")
+                break
+            qloo_id = _first_qloo_id(resp)
+            if qloo_id:
+                logger.success(f"Found Qloo ID for '{query}': {qloo_id}")
+                return qloo_id
+        else:
+            logger.warning(f"Could not find a Qloo entity for '{entity_name}' across all supported types.")
+            return None
+    except _QlooRateLimited as e:
+        logger.warning(f"Qloo /search for '{entity_name}' is still rate limited, giving up: {e}")
+        return None
+    except Exception as e:
+        logger.warning(f"Qloo multi-type /search request failed for '{entity_name}': {e}; searching per type.")
+
+    async def _search_type(entity_type: str) -> Optional[str]:
         try:
-            resp = await client.get(f"{QLOO_HACKATHON_BASE_URL}/search", params=params, headers=headers, timeout=10.0)
-            
-            if resp.status_code == 200:
-                data = resp.json()
-                results = data.get("results", [])
-                if results:
-                    qloo_id = results[0].get("id")
-                    if qloo_id:
-                        logger.success(f"Found Qloo ID for '{entity_name}' (as type {entity_type}): {qloo_id}")
-                        return qloo_id
-            elif resp.status_code == 429:
-                logger.warning(f"Rate limited by Qloo /search for type {entity_type}. Waiting...")
-                await asyncio.sleep(2)
-        
+            resp = await _qloo_get(client, "/search", {"query": entity_name, "types": entity_type}, timeout=10.0)
+            return _first_qloo_id(resp) if resp.status_code == 200 else None
         except Exception as e:
             logger.error(f"Qloo /search request failed for '{entity_name}' with type {entity_type}: {e}")
-            continue
-    
+            return None
+
+    # All types are searched together; the first match in QLOO_ENTITY_TYPE_LIST order wins.
+    per_type_ids = await asyncio.gather(*(_search_type(entity_type) for entity_type in QLOO_ENTITY_TYPE_LIST))
+    for entity_type, qloo_id in zip(QLOO_ENTITY_TYPE_LIST, per_type_ids):
+        if qloo_id:
+            logger.success(f"Found Qloo ID for '{entity_name}' (as type {entity_type}): {qloo_id}")
+            return qloo_id
+
     logger.warning(f"Could not find a Qloo entity for '{entity_name}' across all supported types.")
     return None
 
-async def _get_tastes_for_entity(client: httpx.AsyncClient, qloo_id: str) -> Set[str]:
+async def _fetch_tastes_for_entity(client: httpx.AsyncClient, qloo_id: str) -> FrozenSet[str]:
     """Correctly uses the /v2/insights endpoint to get taste data (tags) for an entity."""
-    headers = {"x-api-key": settings.QLOO_API_KEY}
-    params = {
-        "signal.interests.entities": qloo_id,
-        "filter.type": "urn:tag",
-        "take": 50
-    }
+    params = {**_QLOO_TASTE_PARAMS, "signal.interests.entities": qloo_id, "take": 50}
 
     try:
-        resp = await client.get(f"{QLOO_HACKATHON_BASE_URL}/v2/insights", params=params, headers=headers, timeout=15.0)
+        resp = await _qloo_get(client, "/v2/insights", params, timeout=15.0)
 
         if resp.status_code == 200:
-            data = resp.json()
+            data = _loads(resp.content)
             entities = data.get("results", {}).get("entities", [])
-            tastes = {entity.get('name') for entity in entities if entity.get('name')}
+            # Interned so the same tag from different lookups is one object: set operations across
+            # brands then match on identity and the string hash is only ever computed once.
+            tastes = frozenset(sys.intern(name) for entity in entities if isinstance(name := entity.get('name'), str) and name)
             if tastes:
                 logger.success(f"Fetched {len(tastes)} tastes for ID {qloo_id}")
                 return tastes
-        elif resp.status_code == 429:
-            logger.warning("Rate limited by Qloo /insights. Waiting...")
-            await asyncio.sleep(2)
         else:
             logger.warning(f"Qloo insights for ID {qloo_id} failed with status {resp.status_code}: {resp.text[:200]}")
     
     except Exception as e:
         logger.error(f"Qloo /insights request failed for ID {qloo_id}: {e}")
 
-    return set()
-
-async def _get_tastes_for_term(client: httpx.AsyncClient, term: str) -> Set[str]:
-    """Combined helper to find an ID and then get its tastes."""
-    qloo_id = await _find_qloo_id(client, term)
-    if qloo_id:
-        return await _get_tastes_for_entity(client, qloo_id)
-    return set()
+    return frozenset()
+
+def _merge_tastes(taste_sets: Iterable[FrozenSet[str]]) -> Set[str]:
+    """Unions taste sets in place, without first materializing them all as call arguments."""
+    merged: Set[str] = set()
+    for tastes in taste_sets:
+        merged |= tastes
+    return merged
+
+async def _find_qloo_ids(client: httpx.AsyncClient, terms: List[str]) -> List[Optional[str]]:
+    """Resolves all terms to Qloo IDs in one concurrent batch, at most QLOO_MAX_CONCURRENCY in flight."""
+    semaphore = asyncio.Semaphore(QLOO_MAX_CONCURRENCY)
+    async def _find_with_semaphore(term: str) -> Optional[str]:
+        async with semaphore:
+            return await _find_qloo_id(client, term)
+    return await asyncio.gather(*[_find_with_semaphore(term) for term in terms])
+
+async def _get_tastes_for_ids(client: httpx.AsyncClient, qloo_ids: List[str]) -> Dict[str, FrozenSet[str]]:
+    """Fetches the tastes of every distinct ID in one concurrent batch, at most QLOO_MAX_CONCURRENCY in flight."""
+    semaphore = asyncio.Semaphore(QLOO_MAX_CONCURRENCY)
+    async def _tastes_with_semaphore(qloo_id: str) -> FrozenSet[str]:
+        async with semaphore:
+            return await _get_tastes_for_entity(client, qloo_id)
+    unique_ids = list(dict.fromkeys(qloo_ids))
+    return dict(zip(unique_ids, await asyncio.gather(*[_tastes_with_semaphore(qloo_id) for qloo_id in unique_ids])))
 
 # --- Agent Tools (Using Corrected Functions) ---
 
-async def _web_search_tool(query: str) -> Dict[str, Any]:
-    """Performs a web search, summarizes results, and returns summary and sources."""
+# Searches in flight, keyed by query, so concurrent runs issuing the same search share one Tavily request.
+_web_search_inflight: "OrderedDict[str, Tuple[float, asyncio.Future]]" = OrderedDict()
+
+async def _web_search_fetch(query: str) -> TavilySearchToolOutput:
+    """Performs the raw web search for a query, without summarizing it."""
     logger.info(f"AGENT TOOL: Web Search with query: '{query}'")
-    search_result = await web_search(query)
+    return await _single_flight(_web_search_inflight, " ".join(query.split()), lambda: web_search(query), keep_results=False)
+
+async def _web_search_summarize(search_result: TavilySearchToolOutput, query: str) -> Dict[str, Any]:
+    """Summarizes a raw web search result and returns summary and sources."""
     summary = await _summarize_with_gemini(search_result['context_str'], query)
     return {"context_str": summary, "sources": search_result["sources"]}
 
+# Paraphrased searches ("Apple company profile" / "overview of Apple Inc.") reuse an earlier
+# result when their embeddings are close. Candidates are bucketed by the proper nouns in the
+# query, so templated queries about different brands can never match each other.
+EMBEDDING_MODEL = "models/text-embedding-004"
+SEMANTIC_CACHE_THRESHOLD = 0.92
+SEMANTIC_CACHE_MAX_KEYS = 256
+SEMANTIC_CACHE_MAX_PER_KEY = 16
+# Same lifetime as the exact-match tool result cache.
+SEMANTIC_CACHE_TTL = 86400
+# entities -> [(expires_at, embedding, result)]
+_semantic_search_cache: Dict[frozenset, List[Tuple[float, List[float], Dict[str, Any]]]] = {}
+# Raw search context handed to the planner while a deferred summary is still running.
+DEFERRED_CONTEXT_CHARS = 4000
+_PROPER_NOUN_RE = re.compile(r"\b[A-Z0-9][\w&'-]*")
+
+def _query_entities(query: str) -> frozenset:
+    """The query's proper nouns, casefolded and without corporate suffixes."""
+    return frozenset(
+        _normalize_term(word) for word in _PROPER_NOUN_RE.findall(query)
+        if not _CORPORATE_SUFFIX_RE.fullmatch(f" {word}")
+    )
+
+async def _embed_query(query: str) -> Optional[List[float]]:
+    """Unit-normalized query embedding, or None if the embedding call fails."""
+    try:
+        result = await genai.embed_content_async(model=EMBEDDING_MODEL, content=query, task_type="retrieval_query")
+    except Exception as e:
+        logger.warning(f"Query embedding failed, skipping semantic cache: {e}")
+        return None
+    vector = result["embedding"]
+    norm = math.sqrt(sum(x * x for x in vector)) or 1.0
+    return [x / norm for x in vector]
+
+async def _web_search_tool(query: str) -> Dict[str, Any]:
+    """Performs a web search, summarizes results, and returns summary and sources."""
+    entities = _query_entities(query)
+    # The cache is checked before searching: a hit must not cost a (billed) Tavily request.
+    vector = await _embed_query(query) if entities else None
+    if vector is not None:
+        now = time.monotonic()
+        for expires_at, cached_vector, cached_result in _semantic_search_cache.get(entities, ()):
+            if expires_at > now and sum(map(operator.mul, vector, cached_vector)) >= SEMANTIC_CACHE_THRESHOLD:
+                logger.info(f"Semantic cache hit for web search: '{query}'")
+                return cached_result
+
+    search_result = await _web_search_fetch(query)
+    if _defer_summaries.get() and len(search_result['context_str']) >= SUMMARY_MIN_CONTEXT_CHARS:
+        summary_task = asyncio.ensure_future(_deferred_web_search_summary(search_result, query, entities, vector))
+        return {
+            "context_str": search_result['context_str'][:DEFERRED_CONTEXT_CHARS],
+            "sources": search_result["sources"],
+            "summary_task": summary_task,
+        }
+    return await _summarize_and_remember(search_result, query, entities, vector)
+
+async def _deferred_web_search_summary(
+    search_result: TavilySearchToolOutput, query: str, entities: frozenset, vector: Optional[List[float]]
+) -> Dict[str, Any]:
+    # The batch that started this summary has already drained its stream; don't write into it.
+    _summary_stream.set(None)
+    return await _summarize_and_remember(search_result, query, entities, vector)
+
+async def _summarize_and_remember(
+    search_result: TavilySearchToolOutput, query: str, entities: frozenset, vector: Optional[List[float]]
+) -> Dict[str, Any]:
+    """Summarizes a web search and stores it in the semantic cache."""
+    result = await _web_search_summarize(search_result, query)
+    if vector is not None and _is_cacheable_tool_result(result):
+        now = time.monotonic()
+        bucket = _semantic_search_cache.setdefault(entities, [])
+        bucket[:] = [entry for entry in bucket if entry[0] > now]
+        bucket.append((now + SEMANTIC_CACHE_TTL, vector, result))
+        del bucket[:-SEMANTIC_CACHE_MAX_PER_KEY]
+        if len(_semantic_search_cache) > SEMANTIC_CACHE_MAX_KEYS:
+            _semantic_search_cache.pop(next(iter(_semantic_search_cache)))
+    return result
+
 async def _corporate_culture_tool(brand_name: str) -> Dict[str, Any]:
     """Researches the corporate culture, values, leadership, and workplace environment of a brand."""
     logger.info(f"AGENT TOOL: Corporate Culture search for brand: '{brand_name}'")
     query = f"corporate culture, values, leadership, and workplace environment for {brand_name}"
-    search_result = await web_search(query)
+    search_result = await _web_search_fetch(query)
     summary = await _summarize_with_gemini(search_result['context_str'], query)
     return {"context_str": summary, "sources": search_result["sources"]}
 
@@ -176,90 +634,109 @@ async def _financial_and_market_tool(brand_name: str) -> Dict[str, Any]:
     """Researches the financial profile, market position, and recent financial news of a brand."""
     logger.info(f"AGENT TOOL: Financial/Market search for brand: '{brand_name}'")
     query = f"financial profile, market position, revenue, and recent financial news for {brand_name}"
-    search_result = await web_search(query)
+    search_result = await _web_search_fetch(query)
     summary = await _summarize_with_gemini(search_result['context_str'], query)
     return {"context_str": summary, "sources": search_result["sources"]}
 
 
+# In-flight brand-pair profiles, so the cultural analysis and persona expansion tools
+# share one profiling pass when the agent runs them in the same turn.
+_profile_pair_inflight: "OrderedDict[Tuple[str, str], Tuple[float, asyncio.Future]]" = OrderedDict()
+
+async def _profile_brand_pair(acquirer_brand_name: str, target_brand_name: str) -> Tuple[Dict[str, Any], Dict[str, Any], List[str], List[str]]:
+    key = (_normalize_term(acquirer_brand_name), _normalize_term(target_brand_name))
+    return await _single_flight(_profile_pair_inflight, key, lambda: _fetch_brand_pair_profile(acquirer_brand_name, target_brand_name), keep_results=False)
+
+async def _fetch_brand_pair_profile(acquirer_brand_name: str, target_brand_name: str) -> Tuple[Dict[str, Any], Dict[str, Any], List[str], List[str]]:
+    """
+    Researches the cultural properties of both brands and extracts their Qloo search proxies.
+    Both web searches run together; the two summaries and the two proxy extractions only
+    depend on the raw search results, so the summaries and the single paired proxy
+    extraction are issued as one batch.
+    """
+    acquirer_query = f"famous products and cultural properties of {acquirer_brand_name}"
+    target_query = f"famous products and cultural properties of {target_brand_name}"
+    acquirer_raw, target_raw = await asyncio.gather(
+        _web_search_fetch(acquirer_query),
+        _web_search_fetch(target_query)
+    )
+    acquirer_profile, target_profile, (acquirer_proxies, target_proxies) = await asyncio.gather(
+        _web_search_summarize(acquirer_raw, acquirer_query),
+        _web_search_summarize(target_raw, target_query),
+        _extract_cultural_proxies_pair(acquirer_raw['context_str'], acquirer_brand_name, target_raw['context_str'], target_brand_name)
+    )
+    return acquirer_profile, target_profile, acquirer_proxies, target_proxies
+
+
 async def intelligent_cultural_analysis_tool(acquirer_brand_name: str, target_brand_name: str) -> Dict[str, Any]:
     logger.info(f"AGENT TOOL: INTELLIGENT Cultural Analysis for '{acquirer_brand_name}' vs '{target_brand_name}'")
 
     def _analyze_tastes(acquirer_tastes: Set[str], target_tastes: Set[str], method: str, proxies: dict) -> dict:
-        shared_tastes = list(acquirer_tastes.intersection(target_tastes))
-        union_size = len(acquirer_tastes.union(target_tastes))
-        unique_to_acquirer = list(acquirer_tastes - target_tastes)
-        unique_to_target = list(target_tastes - acquirer_tastes)
+        # Intersect the smaller set against the larger one and derive the rest from it:
+        # |A ∪ B| = |A| + |B| - |A ∩ B|, and only 5 of each difference are ever used. Those 5 are
+        # the alphabetically first rather than whatever set order yields (which changes with the
+        # per-process string hash seed), so the same tastes always produce the same report.
+        small, large = (acquirer_tastes, target_tastes) if len(acquirer_tastes) <= len(target_tastes) else (target_tastes, acquirer_tastes)
+        shared = small & large
+        union_size = len(acquirer_tastes) + len(target_tastes) - len(shared)
+        shared_tastes = heapq.nsmallest(5, shared)
+        unique_to_acquirer = heapq.nsmallest(5, (t for t in acquirer_tastes if t not in shared))
+        unique_to_target = heapq.nsmallest(5, (t for t in target_tastes if t not in shared))
 
         culture_clashes = [
             {"topic": interest, "description": "The Acquirer's audience shows a strong affinity for this, a taste not shared by the Target's.", "severity": "MEDIUM"}
-            for interest in unique_to_acquirer[:5]
+            for interest in unique_to_acquirer
         ] + [
             {"topic": interest, "description": "The Target's audience shows a strong affinity for this, a taste not shared by the Acquirer's.", "severity": "HIGH"}
-            for interest in unique_to_target[:5]
+            for interest in unique_to_target
         ]
         
         untapped_growths = [
             {"description": f"Both audiences show a strong affinity for '{interest}'.", "potential_impact_score": 9}
-            for interest in shared_tastes[:5]
+            for interest in shared_tastes
         ]
 
         return {
-            "context_str": json.dumps({
-                "affinity_overlap_score": round((len(shared_tastes) / union_size * 100), 1) if union_size > 0 else 0,
+            "context_str": _dumps({
+                "affinity_overlap_score": round((len(shared) / union_size * 100), 1) if union_size > 0 else 0,
                 "analysis_method": method,
                 "analysis_proxies": proxies,
             }),
             "qloo_insights_for_stream": { 
-                "shared": shared_tastes[:5], 
-                "acquirer_unique": unique_to_acquirer[:5], 
-                "target_unique": unique_to_target[:5] 
+                "shared": shared_tastes, 
+                "acquirer_unique": unique_to_acquirer, 
+                "target_unique": unique_to_target 
             },
             "culture_clashes": culture_clashes,
             "untapped_growths": untapped_growths,
         }
 
-    timeout_config = httpx.Timeout(connect=10.0, read=30.0, write=10.0, pool=30.0)
-    async with httpx.AsyncClient(timeout=timeout_config) as client:
-        acquirer_profile_result, target_profile_result = await asyncio.gather(
-            _web_search_tool(f"famous products and cultural properties of {acquirer_brand_name}"),
-            _web_search_tool(f"famous products and cultural properties of {target_brand_name}")
-        )
-            
-        try:
-            acquirer_proxies, target_proxies = await asyncio.gather(
-                _extract_cultural_proxies(acquirer_profile_result['context_str'], acquirer_brand_name),
-                _extract_cultural_proxies(target_profile_result['context_str'], target_brand_name)
-            )
-            
-            acquirer_search_terms = list(set([acquirer_brand_name] + acquirer_proxies))
-            target_search_terms = list(set([target_brand_name] + target_proxies))
+    acquirer_profile_result, target_profile_result, acquirer_proxies, target_proxies = await _profile_brand_pair(acquirer_brand_name, target_brand_name)
+
+    client = _get_qloo_client()
+    try:
+        acquirer_search_terms = _dedupe_search_terms([acquirer_brand_name] + acquirer_proxies)
+        target_search_terms = _dedupe_search_terms([target_brand_name] + target_proxies)
             
-            logger.info(f"Primary Analysis - Acquirer Terms: {acquirer_search_terms}")
-            logger.info(f"Primary Analysis - Target Terms: {target_search_terms}")
+        logger.info(f"Primary Analysis - Acquirer Terms: {acquirer_search_terms}")
+        logger.info(f"Primary Analysis - Target Terms: {target_search_terms}")
 
-            semaphore = asyncio.Semaphore(3)
-            async def _get_tastes_with_semaphore(term):
-                async with semaphore:
-                    await asyncio.sleep(0.5) # Gentle delay
-                    return await _get_tastes_for_term(client, term)
+        # Two phases instead of an ID -> tastes chain per term: resolve every ID, then fetch every taste set.
+        ids = await _find_qloo_ids(client, acquirer_search_terms + target_search_terms)
+        acquirer_ids = [qloo_id for qloo_id in ids[:len(acquirer_search_terms)] if qloo_id]
+        target_ids = [qloo_id for qloo_id in ids[len(acquirer_search_terms):] if qloo_id]
+        tastes_by_id = await _get_tastes_for_ids(client, acquirer_ids + target_ids)
 
-            acquirer_tasks = [_get_tastes_with_semaphore(term) for term in acquirer_search_terms]
-            target_tasks = [_get_tastes_with_semaphore(term) for term in target_search_terms]
-            
-            primary_acquirer_results, primary_target_results = await asyncio.gather(
-                asyncio.gather(*acquirer_tasks), asyncio.gather(*target_tasks)
-            )
-            
-            aggregated_acquirer_tastes = set().union(*primary_acquirer_results)
-            aggregated_target_tastes = set().union(*primary_target_results)
+        aggregated_acquirer_tastes = _merge_tastes(tastes_by_id[qloo_id] for qloo_id in acquirer_ids)
+        aggregated_target_tastes = _merge_tastes(tastes_by_id[qloo_id] for qloo_id in target_ids)
 
-            if aggregated_acquirer_tastes and aggregated_target_tastes:
-                logger.success("Primary analysis successful with aggregated proxy data.")
-                analysis = _analyze_tastes(aggregated_acquirer_tastes, aggregated_target_tastes, "Intelligent Proxy", {"acquirer": acquirer_search_terms, "target": target_search_terms})
-                return {**analysis, "sources": acquirer_profile_result.get('sources', []) + target_profile_result.get('sources', [])}
+        if aggregated_acquirer_tastes and aggregated_target_tastes:
+            logger.success("Primary analysis successful with aggregated proxy data.")
+            analysis = _analyze_tastes(aggregated_acquirer_tastes, aggregated_target_tastes, "Intelligent Proxy", {"acquirer": acquirer_search_terms, "target": target_search_terms})
+            return {**analysis, "sources": acquirer_profile_result.get('sources', []) + target_profile_result.get('sources', [])}
 
-        except Exception as e:
-            logger.error(f"Critical error in cultural analysis: {e}")
+    except Exception as e:
+        logger.error(f"Critical error in cultural analysis: {e}")
 
     logger.warning("Qloo API unavailable or returned no data. Falling back to web-search-based cultural analysis.")
     return await _web_search_cultural_fallback(acquirer_brand_name, target_brand_name, acquirer_profile_result, target_profile_result)
@@ -267,7 +744,7 @@ async def intelligent_cultural_analysis_tool(acquirer_brand_name: str, target_br
 async def _web_search_cultural_fallback(acquirer_brand: str, target_brand: str, acquirer_profile: dict, target_profile: dict) -> Dict[str, Any]:
     """Fallback cultural analysis using only web search data when Qloo API fails."""
     try:
-        model = genai.GenerativeModel(settings.GEMINI_MODEL_NAME)
+        model = _gemini_model
         prompt = f"""
         Based on the following information about two companies, perform a cultural analysis for a potential acquisition.
         
@@ -287,7 +764,7 @@ async def _web_search_cultural_fallback(acquirer_brand: str, target_brand: str,
         Focus on cultural values, audience demographics, brand positioning, and market presence.
         """
         response = await model.generate_content_async(prompt, generation_config={"response_mime_type": "application/json"})
-        analysis_data = json.loads(response.text)
+        analysis_data = _loads(response.text)
         
         shared = analysis_data.get("shared_affinities_top_5", [])
         acquirer_unique = analysis_data.get("acquirer_unique_tastes_top_5", [])
@@ -298,7 +775,7 @@ async def _web_search_cultural_fallback(acquirer_brand: str, target_brand: str,
         untapped_growths = [{"description": f"Both brands share '{item}' as a cultural element", "potential_impact_score": 7} for item in shared[:3]]
         
         return {
-            "context_str": json.dumps(analysis_data),
+            "context_str": _dumps(analysis_data),
             "qloo_insights_for_stream": {"shared": shared, "acquirer_unique": acquirer_unique, "target_unique": target_unique},
             "culture_clashes": culture_clashes,
             "untapped_growths": untapped_growths,
@@ -306,13 +783,13 @@ async def _web_search_cultural_fallback(acquirer_brand: str, target_brand: str,
         }
     except Exception as e:
         logger.error(f"Web search fallback analysis failed: {e}")
-        return {"context_str": json.dumps({"error": "Cultural analysis unavailable", "affinity_overlap_score": 0, "analysis_method": "Failed Fallback"}), "culture_clashes": [], "untapped_growths": [], "sources": []}
+        return {"context_str": _dumps({"error": "Cultural analysis unavailable", "affinity_overlap_score": 0, "analysis_method": "Failed Fallback"}), "culture_clashes": [], "untapped_growths": [], "sources": []}
 
 async def _persona_expansion_fallback(acquirer_brand: str, target_brand: str, acquirer_profile: dict, target_profile: dict) -> Dict[str, Any]:
     """Fallback for persona expansion using only web search data."""
     logger.warning("Qloo Persona analysis unavailable. Falling back to web-search-based expansion analysis.")
     try:
-        model = genai.GenerativeModel(settings.GEMINI_MODEL_NAME)
+        model = _gemini_model
         prompt = f"""
         Based on the provided company profiles, analyze the potential for audience expansion if the acquirer buys the target.
 
@@ -331,84 +808,226 @@ async def _persona_expansion_fallback(acquirer_brand: str, target_brand: str, ac
         return {"context_str": response.text}
     except Exception as e:
         logger.error(f"Persona expansion fallback analysis failed: {e}")
-        return {"context_str": json.dumps({"error": "Persona expansion analysis unavailable.", "expansion_score": 0, "latent_synergies": []})}
+        return {"context_str": _dumps({"error": "Persona expansion analysis unavailable.", "expansion_score": 0, "latent_synergies": []})}
 
 async def persona_expansion_tool(acquirer_brand_name: str, target_brand_name: str) -> Dict[str, Any]:
     logger.info(f"AGENT TOOL: PERSONA EXPANSION for '{acquirer_brand_name}' vs '{target_brand_name}'")
 
-    timeout_config = httpx.Timeout(connect=10.0, read=30.0, write=10.0, pool=30.0)
-    async with httpx.AsyncClient(timeout=timeout_config) as client:
-        acquirer_profile, target_profile = await asyncio.gather(
-            _web_search_tool(f"famous products and cultural properties of {acquirer_brand_name}"),
-            _web_search_tool(f"famous products and cultural properties of {target_brand_name}")
-        )
-        
-        try:
-            acquirer_proxies, target_proxies = await asyncio.gather(
-                _extract_cultural_proxies(acquirer_profile['context_str'], acquirer_brand_name),
-                _extract_cultural_proxies(target_profile['context_str'], target_brand_name)
-            )
-            acquirer_search_terms = list(set([acquirer_brand_name] + acquirer_proxies))
-            target_search_terms = list(set([target_brand_name] + target_proxies))
-
-            semaphore = asyncio.Semaphore(3)
-            async def _get_id_with_semaphore(term: str):
-                async with semaphore:
-                    await asyncio.sleep(0.5)
-                    return await _find_qloo_id(client, term)
-            async def _get_tastes_with_semaphore(term: str):
-                async with semaphore:
-                    await asyncio.sleep(0.5)
-                    return await _get_tastes_for_term(client, term)
-
-            acquirer_id_tasks = [_get_id_with_semaphore(term) for term in acquirer_search_terms]
-            target_taste_tasks = [_get_tastes_with_semaphore(term) for term in target_search_terms]
-
-            acquirer_ids_list, target_tastes_list = await asyncio.gather(
-                asyncio.gather(*acquirer_id_tasks), asyncio.gather(*target_taste_tasks)
-            )
-            acquirer_ids = [id for id in acquirer_ids_list if id]
-            target_actual_tastes = set().union(*target_tastes_list)
-
-            if not acquirer_ids or not target_actual_tastes:
-                logger.warning("Could not find necessary Qloo data for persona expansion. Using fallback.")
-                return await _persona_expansion_fallback(acquirer_brand_name, target_brand_name, acquirer_profile, target_profile)
+    acquirer_profile, target_profile, acquirer_proxies, target_proxies = await _profile_brand_pair(acquirer_brand_name, target_brand_name)
+
+    client = _get_qloo_client()
+    try:
+        acquirer_search_terms = _dedupe_search_terms([acquirer_brand_name] + acquirer_proxies)
+        target_search_terms = _dedupe_search_terms([target_brand_name] + target_proxies)
+
+        ids = await _find_qloo_ids(client, acquirer_search_terms + target_search_terms)
+        acquirer_ids = [qloo_id for qloo_id in ids[:len(acquirer_search_terms)] if qloo_id]
+        target_ids = [qloo_id for qloo_id in ids[len(acquirer_search_terms):] if qloo_id]
+        target_actual_tastes = _merge_tastes((await _get_tastes_for_ids(client, target_ids)).values())
+
+        if not acquirer_ids or not target_actual_tastes:
+            logger.warning("Could not find necessary Qloo data for persona expansion. Using fallback.")
+            return await _persona_expansion_fallback(acquirer_brand_name, target_brand_name, acquirer_profile, target_profile)
             
-            logger.info(f"Building Acquirer Persona from IDs: {acquirer_ids}")
+        logger.info(f"Building Acquirer Persona from IDs: {acquirer_ids}")
             
-            headers = {"x-api-key": settings.QLOO_API_KEY}
-            params = {
-                "signal.interests.entities": ",".join(acquirer_ids),
-                "filter.type": "urn:tag",
-                "take": 100
-            }
-            resp = await client.get(f"{QLOO_HACKATHON_BASE_URL}/v2/insights", params=params, headers=headers, timeout=30.0)
+        params = {**_QLOO_TASTE_PARAMS, "signal.interests.entities": ",".join(acquirer_ids), "take": 100}
+        resp = await _qloo_get(client, "/v2/insights", params, timeout=30.0)
             
-            if resp.status_code != 200:
-                logger.warning(f"Persona insights call failed with status {resp.status_code}, using fallback.")
-                return await _persona_expansion_fallback(acquirer_brand_name, target_brand_name, acquirer_profile, target_profile)
+        if resp.status_code != 200:
+            logger.warning(f"Persona insights call failed with status {resp.status_code}, using fallback.")
+            return await _persona_expansion_fallback(acquirer_brand_name, target_brand_name, acquirer_profile, target_profile)
 
-            persona_data = resp.json().get("results", {}).get("entities", [])
-            acquirer_predicted_tastes = {item['name'] for item in persona_data if 'name' in item}
-            
-            latent_synergies = acquirer_predicted_tastes.intersection(target_actual_tastes)
-            expansion_score = round((len(latent_synergies) / len(target_actual_tastes)) * 100, 1) if target_actual_tastes else 0
+        persona_data = _loads(resp.content).get("results", {}).get("entities", [])
+        # Only predicted tastes the target already holds matter, so filter while reading the response.
+        latent_synergies = {item['name'] for item in persona_data if item.get('name') in target_actual_tastes}
+        expansion_score = round((len(latent_synergies) / len(target_actual_tastes)) * 100, 1) if target_actual_tastes else 0
             
-            result = {
-                "expansion_score": expansion_score,
-                "latent_synergies": list(latent_synergies)[:10],
-                "analysis": f"The acquirer's audience shows a predicted affinity for {len(latent_synergies)} of the target's core cultural products, indicating a potential taste expansion score of {expansion_score}%.",
-            }
-            return {"context_str": json.dumps(result)}
+        result = {
+            "expansion_score": expansion_score,
+            "latent_synergies": heapq.nsmallest(10, latent_synergies),
+            "analysis": f"The acquirer's audience shows a predicted affinity for {len(latent_synergies)} of the target's core cultural products, indicating a potential taste expansion score of {expansion_score}%.",
+        }
+        return {"context_str": _dumps(result)}
 
-        except Exception as e:
-            logger.error(f"Critical error in persona expansion tool: {e}")
-            return await _persona_expansion_fallback(acquirer_brand_name, target_brand_name, acquirer_profile, target_profile)
+    except Exception as e:
+        logger.error(f"Critical error in persona expansion tool: {e}")
+        return await _persona_expansion_fallback(acquirer_brand_name, target_brand_name, acquirer_profile, target_profile)
+
+
+# Per-brand tools with fixed parameters that every run needs (see REQUIRED_STEPS), so
+# they are started for both brands when a run begins instead of waiting for the planner.
+SPECULATIVE_TOOLS = ("corporate_culture_tool", "financial_and_market_tool")
+
+# Tools whose result depends only on one brand or query, not on the deal being analyzed,
+# so a result from an earlier analysis (even of a different pairing) can be replayed.
+TOOL_RESULT_CACHE_TTL = 86400
+_CACHEABLE_TOOL_PARAMS = {
+    "web_search": "query",
+    "corporate_culture_tool": "brand_name",
+    "financial_and_market_tool": "brand_name",
+}
+
+def _tool_cache_key(tool_name: str, params: Dict[str, Any]) -> Optional[str]:
+    param = _CACHEABLE_TOOL_PARAMS.get(tool_name)
+    value = params.get(param) if param else None
+    if not isinstance(value, str) or not value.strip():
+        return None
+    return llm_cache.make_key("tool", tool_name, _normalize_term(value))
+
+def _is_cacheable_tool_result(tool_result: Dict[str, Any]) -> bool:
+    """Only successful, summarized searches are replayed; failed ones come back without sources."""
+    return (
+        bool(tool_result.get("sources"))
+        and tool_result.get("context_str") != SUMMARY_UNAVAILABLE
+        and "summary_task" not in tool_result
+    )
+
+# Where each tool's result lands in the agent state.
+# Per-brand research tools: (tool_name, role) -> (completed_step, gathered_data key, all_sources key).
+_PROFILE_TOOL_STATE: Dict[Tuple[str, str], Tuple[str, str, str]] = {
+    ("web_search", "acquirer"): ("searched_acquirer_profile", "acquirer_profile", "acquirer_sources"),
+    ("web_search", "target"): ("searched_target_profile", "target_profile", "target_sources"),
+    ("corporate_culture_tool", "acquirer"): ("searched_acquirer_culture", "acquirer_culture_profile", "acquirer_culture_sources"),
+    ("corporate_culture_tool", "target"): ("searched_target_culture", "target_culture_profile", "target_culture_sources"),
+    ("financial_and_market_tool", "acquirer"): ("searched_acquirer_financial", "acquirer_financial_profile", "acquirer_financial_sources"),
+    ("financial_and_market_tool", "target"): ("searched_target_financial", "target_financial_profile", "target_financial_sources"),
+}
+# Deal-level analysis tools returning JSON: tool_name -> (completed_step, gathered_data key).
+_ANALYSIS_TOOL_STATE: Dict[str, Tuple[str, str]] = {
+    "intelligent_cultural_analysis_tool": ("performed_intelligent_qloo_analysis", "qloo_analysis"),
+    "persona_expansion_tool": ("performed_persona_expansion", "persona_expansion"),
+}
+# Every step of the workflow in SYSTEM_PROMPT; once all are done there is nothing left to plan.
+REQUIRED_STEPS = frozenset(
+    [step for step, _, _ in _PROFILE_TOOL_STATE.values()] + [step for step, _ in _ANALYSIS_TOOL_STATE.values()]
+)
+
+# Network and payload failures a tool can hit in normal operation; logged without a traceback.
+# json.JSONDecodeError also covers orjson's subclass. Anything else is a bug and keeps its traceback.
+_EXPECTED_TOOL_ERRORS = (asyncio.TimeoutError, httpx.HTTPError, json.JSONDecodeError)
+
+SOURCE_KEYS = (
+    'acquirer_sources', 'target_sources', 'search_sources',
+    'acquirer_culture_sources', 'target_culture_sources',
+    'acquirer_financial_sources', 'target_financial_sources',
+)
+# Sources kept per key; later hits add little to the report and would only grow the saved rows.
+MAX_SOURCES_PER_KEY = 50
+
+def _source_id(source: Dict[str, str]) -> str:
+    return source.get("url") or source.get("title", "")
+
+# Gemini errors worth retrying before giving up on the run.
+_TRANSIENT_GEMINI_ERRORS = (
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.ResourceExhausted,
+    google_exceptions.DeadlineExceeded,
+)
+
+def _log_gemini_retry(retry_state: RetryCallState) -> None:
+    logger.warning(f"Transient Gemini error (attempt {retry_state.attempt_number}), retrying: {retry_state.outcome.exception()}")
+
+@retry(
+    retry=retry_if_exception_type(_TRANSIENT_GEMINI_ERRORS),
+    wait=wait_exponential_jitter(multiplier=0.5, max=8),
+    stop=stop_after_attempt(4),
+    before_sleep=_log_gemini_retry,
+    reraise=True,
+)
+async def _open_planner_stream(model: genai.GenerativeModel, prompt: str) -> Tuple[Any, AsyncIterator[Any]]:
+    """
+    Starts a planner stream and waits for its first chunk (None for an empty stream).
+    Only this part is retried: nothing has been forwarded to the client yet, so a retry
+    can't repeat events for the same turn.
+    """
+    generation_config = {"response_mime_type": "application/json"}
+    response_stream = await model.generate_content_async(prompt, generation_config=generation_config, stream=True)
+    chunks = aiter(response_stream)
+    return await anext(chunks, None), chunks
+
+async def _stream_planner_response(model: genai.GenerativeModel, prompt: str, sink: Optional[asyncio.Queue]) -> str:
+    """
+    Streams one planner response, forwarding the thought and the chosen tool to `sink` as soon
+    as each has arrived, so the client sees the reasoning before the action is complete.
+    """
+    chunk, chunks = await _open_planner_stream(model, prompt)
+    response_text, thought_sent, planned_tool = "", False, None
+    while chunk is not None:
+        response_text += chunk.text
+        if sink is not None:
+            if not thought_sent and (match := _PLANNED_THOUGHT_RE.search(response_text)):
+                thought_sent = True
+                # Best effort: a capture with an escape JSON rejects skips the early event
+                # and leaves the verdict to the full-response parse.
+                try:
+                    sink.put_nowait({"status": "thought", "message": _loads(match.group(1)), "cache_hit": False})
+                except orjson.JSONDecodeError:
+                    pass
+            if planned_tool is None and (match := _PLANNED_TOOL_RE.search(response_text)):
+                planned_tool = match.group(1)
+                sink.put_nowait({"status": "planned_tool", "tool_name": planned_tool})
+        chunk = await anext(chunks, None)
+    return response_text
+
+_TRAILING_COMMA_RE = re.compile(r",\s*([}\]])")
+
+def _parse_planner_json(response_text: str) -> Any:
+    """
+    Parses a planner response, repairing the usual near-misses locally (```json fences or
+    prose around the object, trailing commas) so they don't cost another planner turn.
+    """
+    try:
+        return _loads(response_text)
+    except json.JSONDecodeError:
+        start, end = response_text.find("{"), response_text.rfind("}")
+        if start == -1 or end < start:
+            raise
+    parsed = _loads(_TRAILING_COMMA_RE.sub(r"\1", response_text[start:end + 1]))
+    logger.debug("Repaired malformed planner JSON locally.")
+    return parsed
+
+def _is_planner_response(response_text: str) -> bool:
+    """Checks that a planner response is a JSON object with `thought` and `action` before caching it."""
+    try:
+        parsed = _loads(response_text)
+    except (json.JSONDecodeError, TypeError):
+        return False
+    return isinstance(parsed, dict) and "thought" in parsed and isinstance(parsed.get("action"), dict)
+
+async def _drain_stream(tool_task: asyncio.Future, queue: asyncio.Queue) -> AsyncGenerator[Any, None]:
+    """Yields items pushed onto `queue` by a running task until the task finishes."""
+    try:
+        while not tool_task.done():
+            getter = asyncio.ensure_future(queue.get())
+            done, _ = await asyncio.wait({getter, tool_task}, return_when=asyncio.FIRST_COMPLETED)
+            if getter in done:
+                yield getter.result()
+            else:
+                getter.cancel()
+        while not queue.empty():
+            yield queue.get_nowait()
+    finally:
+        if not tool_task.done():
+            tool_task.cancel()
 
 
 # --- The Stateful ReAct Agent ---
+SCRATCHPAD_WINDOW = 5
+OBSERVATION_PREVIEW_CHARS = 500
+
 class AlloyReActAgent:
-    PROMPT_TEMPLATE = """
+    __slots__ = (
+        "acquirer_brand", "target_brand", "_acq_folded", "_tgt_folded", "user_context",
+        "max_parallel_tools", "model", "completed_steps", "scratchpad", "omitted_steps",
+        "gathered_data", "final_data", "tools", "_sources", "_streamed_source_urls",
+        "_speculative_results", "_pending_summaries",
+    )
+
+    # Static instructions shared by every agent; sent once as a Gemini system instruction.
+    # Prompts are dedented once here so the class-body indentation is neither formatted
+    # each turn nor sent as tokens.
+    SYSTEM_PROMPT = textwrap.dedent("""
     You are a sophisticated strategic analyst AI for a financial firm specializing in M&A cultural analysis.
     Your job is to execute a strategic sequence of tool calls to gather comprehensive data about two companies and their cultural overlap, synergies, and expansion potential.
     Do not synthesize or generate the final report yourself. Simply gather the data methodically and pass it to the 'finish' tool.
@@ -434,17 +1053,36 @@ class AlloyReActAgent:
     
     Example:
     ```json
-    {{
+    {
       "thought": "I have completed the basic profiling for the acquirer. Now I will do the same for the target.",
-      "action": {{
+      "action": {
         "tool_name": "web_search",
-        "parameters": {{
-          "query": "{target_brand} company profile"
-        }}
-      }}
-    }}
+        "parameters": {
+          "query": "Globex Corp company profile"
+        }
+      }
+    }
     ```
 
+    When several steps are independent (e.g. the same research for both companies), you may run up to 4 of them at once
+    by replacing the single tool call with a "parallel" list:
+    ```json
+    {
+      "thought": "Both culture profiles are independent, so I will research them together.",
+      "action": {
+        "parallel": [
+          {"tool_name": "corporate_culture_tool", "parameters": {"brand_name": "Acme Inc."}},
+          {"tool_name": "corporate_culture_tool", "parameters": {"brand_name": "Globex Corp"}}
+        ]
+      }
+    }
+    ```
+
+    Each request gives the current task, the completed steps and the log of previous actions. Based on them, choose the
+    next logical strategic analysis action. Focus on completing the workflow systematically. Return ONLY the JSON object.
+    """).strip()
+
+    PROMPT_TEMPLATE = textwrap.dedent("""
     **CURRENT TASK:**
     Conduct a comprehensive strategic analysis for the acquisition of target **{target_brand}** by acquirer **{acquirer_brand}**.
     User-provided context: {user_context}
@@ -454,17 +1092,21 @@ class AlloyReActAgent:
     
     **PREVIOUS ACTIONS LOG:**
     {scratchpad}
-
-    Based on the completed steps and previous actions, what is the next logical strategic analysis action? Focus on completing the workflow systematically. Return ONLY the JSON object.
-    """
+    """).strip()
 
     def __init__(self, acquirer_brand: str, target_brand: str, user_context: str | None = None):
         self.acquirer_brand = acquirer_brand
         self.target_brand = target_brand
+        # Case-folded once; role matching compares every tool's query or brand_name against these.
+        self._acq_folded = acquirer_brand.casefold()
+        self._tgt_folded = target_brand.casefold()
         self.user_context = user_context or "None"
-        self.model = genai.GenerativeModel(settings.GEMINI_MODEL_NAME)
+        self.max_parallel_tools = 4
+        self.model = _get_model(settings.GEMINI_MODEL_NAME, self.SYSTEM_PROMPT)
         self.completed_steps: Set[str] = set()
-        self.scratchpad = "" 
+        # Only the most recent steps are replayed to the planner; full results live in gathered_data.
+        self.scratchpad: Deque[str] = deque(maxlen=SCRATCHPAD_WINDOW)
+        self.omitted_steps = 0
         self.gathered_data = {} 
         self.final_data = None
         self.tools = {
@@ -474,15 +1116,38 @@ class AlloyReActAgent:
             "corporate_culture_tool": _corporate_culture_tool,
             "financial_and_market_tool": _financial_and_market_tool
         }
-        self.all_sources: Dict[str, List[Dict[str, str]]] = {
-            'acquirer_sources': [], 'target_sources': [], 'search_sources': [],
-            'acquirer_culture_sources': [], 'target_culture_sources': [],
-            'acquirer_financial_sources': [], 'target_financial_sources': []
-        }
+        # Sources are keyed by URL so repeated search hits are dropped on insert.
+        self._sources: Dict[str, Dict[str, Dict[str, str]]] = {key: {} for key in SOURCE_KEYS}
+        self._streamed_source_urls: Set[str] = set()
+        self._speculative_results: Dict[Tuple[str, str], asyncio.Future] = {}
+        # Web-search summaries still running after their raw results were observed: (params, task).
+        self._pending_summaries: List[Tuple[Dict[str, Any], asyncio.Future]] = []
+
+    @property
+    def all_sources(self) -> Dict[str, List[Dict[str, str]]]:
+        return {key: list(sources.values()) for key, sources in self._sources.items()}
+
+    def _record_sources(self, sources_key: str, sources: List[Dict[str, str]]) -> None:
+        accumulator = self._sources[sources_key]
+        for source in sources:
+            if len(accumulator) >= MAX_SOURCES_PER_KEY:
+                break
+            accumulator.setdefault(_source_id(source), source)
+
+    def _unstreamed_sources(self, sources: List[Dict[str, str]]) -> List[Dict[str, str]]:
+        """Filters out sources that were already sent to the client by an earlier tool."""
+        fresh = []
+        for source in sources:
+            source_id = _source_id(source)
+            if source_id not in self._streamed_source_urls:
+                self._streamed_source_urls.add(source_id)
+                fresh.append(source)
+        return fresh
 
     def _build_prompt(self) -> str:
-        completed_steps_str = "\n".join(f"- {step}" for step in sorted(list(self.completed_steps))) or "None"
-        scratchpad_log = "\n".join(self.scratchpad.splitlines()[-10:])
+        completed_steps_str = "\n".join(f"- {step}" for step in sorted(self.completed_steps)) or "None"
+        omitted = [f"({self.omitted_steps} earlier actions omitted; see COMPLETED STEPS.)"] if self.omitted_steps else []
+        scratchpad_log = "\n".join(omitted + list(self.scratchpad))
         return self.PROMPT_TEMPLATE.format(
             acquirer_brand=self.acquirer_brand,
             target_brand=self.target_brand,
@@ -491,111 +1156,311 @@ class AlloyReActAgent:
             scratchpad=scratchpad_log
         )
 
+    def _start_speculative_tools(self) -> None:
+        for tool_name in SPECULATIVE_TOOLS:
+            for brand_name in (self.acquirer_brand, self.target_brand):
+                self._speculative_results[(tool_name, brand_name)] = asyncio.ensure_future(
+                    self._run_tool(tool_name, {"brand_name": brand_name})
+                )
+
+    def _cancel_speculative_tools(self) -> None:
+        for task in self._speculative_results.values():
+            if not task.done():
+                task.cancel()
+            elif not task.cancelled() and task.exception() is not None:
+                logger.warning(f"Unused speculative tool call failed: {task.exception()!r}")
+        self._speculative_results.clear()
+
     async def run_stream(self) -> AsyncGenerator[Dict[str, Any], None]:
+        if settings.AGENT_SPECULATIVE_TOOLS:
+            self._start_speculative_tools()
+        # Without user context there is nothing for the planner to reason about, so the
+        # fixed workflow runs in one batch; the ReAct loop is kept for custom instructions.
+        run = self._run_turns() if self._has_user_context() else self._run_planned()
+        try:
+            async for event in run:
+                yield event
+        finally:
+            # Speculative results the planner never asked for are not needed once the run ends.
+            self._cancel_speculative_tools()
+            for _, task in self._pending_summaries:
+                task.cancel()
+            self._pending_summaries.clear()
+
+    def _has_user_context(self) -> bool:
+        return self.user_context.strip() not in ("", "None")
+
+    def _planned_actions(self) -> List[Dict[str, Any]]:
+        """Every workflow step in SYSTEM_PROMPT as one batch of independent actions."""
+        brands = (self.acquirer_brand, self.target_brand)
+        actions = [{"tool_name": "web_search", "parameters": {"query": f"{brand} company profile"}} for brand in brands]
+        actions += [{"tool_name": tool_name, "parameters": {"brand_name": brand}} for tool_name in SPECULATIVE_TOOLS for brand in brands]
+        actions += [
+            {"tool_name": tool_name, "parameters": {"acquirer_brand_name": self.acquirer_brand, "target_brand_name": self.target_brand}}
+            for tool_name in _ANALYSIS_TOOL_STATE
+        ]
+        return actions
+
+    async def _run_planned(self) -> AsyncGenerator[Dict[str, Any], None]:
+        yield {"status": "thought", "message": "No additional context was provided, so every analysis step runs at once.", "cache_hit": False}
+        async for event in self._run_actions(self._planned_actions()):
+            yield event
+        if REQUIRED_STEPS <= self.completed_steps:
+            self.final_data = self.gathered_data
+            yield {"status": "complete"}
+            return
+        # Some tools failed; the planner sees what is done and decides how to recover the rest.
+        logger.warning(f"Planned run left steps incomplete: {sorted(REQUIRED_STEPS - self.completed_steps)}")
+        async for event in self._run_turns():
+            yield event
+
+    async def _run_turns(self) -> AsyncGenerator[Dict[str, Any], None]:
         max_turns = 12
         for i in range(max_turns):
             yield {"status": "thinking", "message": f"Strategic analysis step {i+1}/{max_turns}"}
-            
+            await self._settle_summaries(wait=False)
+
             prompt = self._build_prompt()
-            response_text = await self._get_llm_response(prompt)
+            planner_stream: asyncio.Queue = asyncio.Queue()
+            token = _planner_stream.set(planner_stream)
+            try:
+                llm_task = asyncio.ensure_future(self._get_llm_response(prompt))
+            finally:
+                _planner_stream.reset(token)
+            thought_streamed = False
+            async for event in _drain_stream(llm_task, planner_stream):
+                thought_streamed = thought_streamed or event["status"] == "thought"
+                yield event
+            response_text, cache_hit = llm_task.result()
             
             try:
-                response_json = json.loads(response_text)
+                response_json = _parse_planner_json(response_text)
                 thought = response_json.get("thought", "No thought provided.")
                 action_json = response_json.get("action", {})
-                yield {"status": "thought", "message": thought}
+                if not thought_streamed:
+                    yield {"status": "thought", "message": thought, "cache_hit": cache_hit}
                 yield {"status": "action", "payload": action_json}
             except (json.JSONDecodeError, AttributeError) as e:
-                logger.error(f"Agent response was not valid JSON: {e}. Raw response: {response_text}")
+                logger.error(
+                    f"Agent response was not valid JSON: {e}. "
+                    f"Raw response ({len(response_text)} chars): {response_text[:LOG_RAW_RESPONSE_CHARS]}"
+                )
                 observation = f"Error: The previous response was not valid JSON. Correct the format. Error: {e}"
-                self.scratchpad += f"\n**Observation**: {observation}"
+                self._log_step(None, observation)
                 continue
 
-            tool_name, params = action_json.get("tool_name"), action_json.get("parameters", {})
-            
-            if not tool_name:
-                observation = "Error: Your action JSON is missing the 'tool_name' key."
-            elif tool_name == "finish":
+            if action_json.get("tool_name") == "finish":
+                await self._settle_summaries(wait=True)
+                self.final_data = self.gathered_data
+                yield {"status": "complete"}
+                return
+
+            parallel = action_json.get("parallel")
+            if isinstance(parallel, list) and parallel:
+                actions = [a for a in parallel if isinstance(a, dict)][:self.max_parallel_tools]
+            else:
+                actions = [action_json]
+
+            async for event in self._run_actions(actions, defer_summaries=True):
+                yield event
+
+            if REQUIRED_STEPS <= self.completed_steps:
+                # Every workflow step is in; skip the planner round-trip that would only say "finish".
+                logger.info("All analysis steps completed; finishing without another planner turn.")
+                await self._settle_summaries(wait=True)
                 self.final_data = self.gathered_data
                 yield {"status": "complete"}
                 return
+
+        logger.warning("Agent exceeded maximum turns.")
+        await self._settle_summaries(wait=True)
+        self.final_data = self.gathered_data
+        yield {"status": "complete"}
+
+    async def _run_actions(
+        self, actions: List[Dict[str, Any]], defer_summaries: bool = False
+    ) -> AsyncGenerator[Dict[str, Any], None]:
+        """
+        Runs one batch of independent actions, merging each result into the agent's state.
+        With defer_summaries, web searches are observed raw and their summaries settled later.
+        """
+        observations: Dict[int, str] = {}
+        runnable: List[int] = []
+        for idx, action in enumerate(actions):
+            tool_name = action.get("tool_name")
+            if isinstance(tool_name, str):
+                # Names decoded from JSON are fresh strings; interning them lets the lookups
+                # into self.tools and the state tables (whose literal keys are interned) match by identity.
+                tool_name = action["tool_name"] = sys.intern(tool_name)
+            if not tool_name:
+                observations[idx] = "Error: Your action JSON is missing the 'tool_name' key."
+            elif tool_name == "finish":
+                observations[idx] = "Error: 'finish' cannot be combined with other tools."
             elif tool_name not in self.tools:
-                observation = f"Error: Unknown tool '{tool_name}'."
+                observations[idx] = f"Error: Unknown tool '{tool_name}'."
             else:
-                try:
-                    tool_function = self.tools[tool_name]
-                    tool_result = await tool_function(**params)
-                    
-                    observation = tool_result.get('context_str', f"Tool {tool_name} ran successfully.")
-                    sources = tool_result.get('sources', [])
+                runnable.append(idx)
 
+        if runnable:
+            # Independent tools run together; their summaries share one stream to the client.
+            summary_stream: asyncio.Queue = asyncio.Queue()
+            token = _summary_stream.set(summary_stream)
+            defer_token = _defer_summaries.set(defer_summaries)
+            try:
+                batch = asyncio.gather(
+                    *(self._invoke_tool(actions[idx]["tool_name"], actions[idx].get("parameters", {})) for idx in runnable),
+                    return_exceptions=True
+                )
+            finally:
+                _defer_summaries.reset(defer_token)
+                _summary_stream.reset(token)
+            async for query, delta in _drain_stream(batch, summary_stream):
+                yield {"status": "summary_chunk", "query": query, "delta": delta}
+
+            # Results are merged one at a time, so shared state needs no locking.
+            for idx, outcome in zip(runnable, batch.result()):
+                tool_name, params = actions[idx]["tool_name"], actions[idx].get("parameters", {})
+                try:
+                    if isinstance(outcome, Exception):
+                        raise outcome
+                    tool_result, from_cache = outcome
+                    if from_cache:
+                        yield {"status": "cache_hit", "tool_name": tool_name}
                     if tool_name == "intelligent_cultural_analysis_tool" and "qloo_insights_for_stream" in tool_result:
                         yield {"status": "qloo_insight", "payload": {"type": "cultural_analysis", **tool_result["qloo_insights_for_stream"]}}
-
-                    # --- State and Data Management ---
-                    query = params.get('query', '').lower()
-                    brand_name_param = params.get('brand_name', '')
-                    is_acquirer = self.acquirer_brand.lower() in query or self.acquirer_brand == brand_name_param
-                    is_target = self.target_brand.lower() in query or self.target_brand == brand_name_param
-
-                    if tool_name == "web_search":
-                        if is_acquirer:
-                            self.completed_steps.add("searched_acquirer_profile")
-                            self.gathered_data['acquirer_profile'] = observation
-                            self.all_sources['acquirer_sources'].extend(sources)
-                        elif is_target:
-                            self.completed_steps.add("searched_target_profile")
-                            self.gathered_data['target_profile'] = observation
-                            self.all_sources['target_sources'].extend(sources)
-                    elif tool_name == "corporate_culture_tool":
-                        if is_acquirer:
-                            self.completed_steps.add("searched_acquirer_culture")
-                            self.gathered_data['acquirer_culture_profile'] = observation
-                            self.all_sources['acquirer_culture_sources'].extend(sources)
-                        elif is_target:
-                            self.completed_steps.add("searched_target_culture")
-                            self.gathered_data['target_culture_profile'] = observation
-                            self.all_sources['target_culture_sources'].extend(sources)
-                    elif tool_name == "financial_and_market_tool":
-                        if is_acquirer:
-                            self.completed_steps.add("searched_acquirer_financial")
-                            self.gathered_data['acquirer_financial_profile'] = observation
-                            self.all_sources['acquirer_financial_sources'].extend(sources)
-                        elif is_target:
-                            self.completed_steps.add("searched_target_financial")
-                            self.gathered_data['target_financial_profile'] = observation
-                            self.all_sources['target_financial_sources'].extend(sources)
-                    elif tool_name == "intelligent_cultural_analysis_tool":
-                        self.completed_steps.add("performed_intelligent_qloo_analysis")
-                        self.all_sources['search_sources'].extend(sources)
-                        try:
-                            self.gathered_data['qloo_analysis'] = json.loads(observation)
-                            self.gathered_data['culture_clashes'] = tool_result.get('culture_clashes', [])
-                            self.gathered_data['untapped_growths'] = tool_result.get('untapped_growths', [])
-                        except (json.JSONDecodeError, TypeError): self.gathered_data['qloo_analysis'] = {"error": observation}
-                    elif tool_name == "persona_expansion_tool":
-                        self.completed_steps.add("performed_persona_expansion")
-                        try: self.gathered_data['persona_expansion'] = json.loads(observation)
-                        except (json.JSONDecodeError, TypeError): self.gathered_data['persona_expansion'] = {"error": observation}
-                    
-                    for source in sources: yield {"status": "source", "payload": source}
-
+                    observations[idx] = await self._apply_observation(tool_name, params, tool_result)
+                    if "summary_task" in tool_result:
+                        self._pending_summaries.append((params, tool_result["summary_task"]))
+                    # Let other requests' callbacks run between state updates.
+                    await asyncio.sleep(0)
+                    new_sources = self._unstreamed_sources(tool_result.get('sources', []))
+                    if new_sources: yield {"status": "sources_batch", "payload": new_sources}
+                except _EXPECTED_TOOL_ERRORS as e:
+                    logger.warning(f"Tool '{tool_name}' transient failure: {e!r}")
+                    observations[idx] = f"Error: {e}"
                 except Exception as e:
                     logger.error(f"Error executing tool '{tool_name}': {e}", exc_info=True)
-                    observation = f"Error: {e}"
+                    observations[idx] = f"Error: {e}"
 
-            self.scratchpad += f"\nAction: {json.dumps(action_json)}\nObservation: {observation}"
-            yield {"status": "observation", "message": f"Completed {tool_name}"}
+        for idx, action in enumerate(actions):
+            self._log_step(action, observations[idx])
+            yield {"status": "observation", "message": f"Completed {action.get('tool_name')}"}
 
-        logger.warning("Agent exceeded maximum turns.")
-        self.final_data = self.gathered_data
-        yield {"status": "complete"}
+    async def _settle_summaries(self, wait: bool) -> None:
+        """
+        Swaps the raw context of deferred web searches for their summaries. Without wait only
+        finished summaries are taken, so the next planner call is never held up by one.
+        """
+        if not self._pending_summaries:
+            return
+        if wait:
+            await asyncio.wait([task for _, task in self._pending_summaries])
+        still_pending = []
+        for params, task in self._pending_summaries:
+            if not task.done():
+                still_pending.append((params, task))
+                continue
+            try:
+                tool_result = task.result()
+            except Exception as e:
+                # The raw search context already in gathered_data stands in for the summary.
+                logger.warning(f"Deferred summary for '{params.get('query')}' failed: {e!r}")
+                continue
+            await self._apply_observation("web_search", params, tool_result)
+            cache_key = _tool_cache_key("web_search", params)
+            if cache_key and _is_cacheable_tool_result(tool_result):
+                await llm_cache.put(cache_key, _dumps(tool_result), ttl=TOOL_RESULT_CACHE_TTL)
+        self._pending_summaries = still_pending
+
+    async def _invoke_tool(self, tool_name: str, params: Dict[str, Any]) -> Tuple[Dict[str, Any], bool]:
+        """Runs one tool, reusing its speculative run when one was started. Returns (result, from_cache)."""
+        if set(params) == {"brand_name"} and isinstance(params["brand_name"], str):
+            speculative = self._speculative_results.pop((tool_name, params["brand_name"]), None)
+            if speculative is not None:
+                return await speculative
+        return await self._run_tool(tool_name, params)
+
+    async def _run_tool(self, tool_name: str, params: Dict[str, Any]) -> Tuple[Dict[str, Any], bool]:
+        """Runs one tool, replaying a cached result when available. Returns (result, from_cache)."""
+        cache_key = _tool_cache_key(tool_name, params)
+        cached_result = await llm_cache.get(cache_key) if cache_key else None
+        if cached_result is not None:
+            return _loads(cached_result), True
+        tool_result = await self.tools[tool_name](**params)
+        if cache_key and _is_cacheable_tool_result(tool_result):
+            await llm_cache.put(cache_key, _dumps(tool_result), ttl=TOOL_RESULT_CACHE_TTL)
+        return tool_result, False
+
+    def _log_step(self, action: Optional[Dict[str, Any]], observation: str) -> None:
+        """
+        Appends a step to the bounded scratchpad, keeping only a preview of long observations.
+        Entries are rendered once here so building the next prompt is just a join.
+        """
+        if len(self.scratchpad) == self.scratchpad.maxlen:
+            self.omitted_steps += 1
+        if len(observation) > OBSERVATION_PREVIEW_CHARS:
+            observation = observation[:OBSERVATION_PREVIEW_CHARS] + "...[full in gathered_data]"
+        if action is None:
+            self.scratchpad.append(f"**Observation**: {observation}")
+        else:
+            self.scratchpad.append(f"Action: {_dumps(action)}\nObservation: {observation}")
+
+    async def _apply_observation(self, tool_name: str, params: Dict[str, Any], tool_result: Dict[str, Any]) -> str:
+        """Records a tool result in the agent's state and returns the observation for the scratchpad."""
+        observation = tool_result.get('context_str', f"Tool {tool_name} ran successfully.")
+        sources = tool_result.get('sources', [])
+
+        # --- State and Data Management ---
+        query_folded = params.get('query', '').casefold()
+        brand_name_param = params.get('brand_name', '')
+        brand_folded = brand_name_param.casefold() if isinstance(brand_name_param, str) else ''
+        if self._acq_folded in query_folded or self._acq_folded == brand_folded:
+            role = "acquirer"
+        elif self._tgt_folded in query_folded or self._tgt_folded == brand_folded:
+            role = "target"
+        else:
+            role = None
+
+        profile_entry = _PROFILE_TOOL_STATE.get((tool_name, role))
+        if profile_entry:
+            step, data_key, sources_key = profile_entry
+            self.completed_steps.add(step)
+            self.gathered_data[data_key] = observation
+            self._record_sources(sources_key, sources)
+        elif tool_name in _ANALYSIS_TOOL_STATE:
+            step, data_key = _ANALYSIS_TOOL_STATE[tool_name]
+            self.completed_steps.add(step)
+            is_qloo_analysis = tool_name == "intelligent_cultural_analysis_tool"
+            if is_qloo_analysis:
+                self._record_sources('search_sources', sources)
+            try:
+                self.gathered_data[data_key] = await _load_analysis(observation)
+            except (ValueError, TypeError):
+                self.gathered_data[data_key] = {"error": observation}
+            else:
+                if is_qloo_analysis:
+                    self.gathered_data['culture_clashes'] = tool_result.get('culture_clashes', [])
+                    self.gathered_data['untapped_growths'] = tool_result.get('untapped_growths', [])
+
+        return observation
 
-    async def _get_llm_response(self, prompt) -> str:
+    async def _get_llm_response(self, prompt) -> Tuple[str, bool]:
+        """
+        Returns the planner's JSON response and whether it came from the cache.
+        Only exact prompt matches are reused: near-identical planner prompts differ in
+        brand names or completed steps, where a "similar" cached action would be wrong.
+        """
+        cache_key = llm_cache.make_key(settings.GEMINI_MODEL_NAME, self.SYSTEM_PROMPT, prompt)
+        cached = await llm_cache.get(cache_key)
+        if cached is not None:
+            logger.debug("Planner response served from cache.")
+            return cached, True
+        sink = _planner_stream.get()
         try:
-            generation_config = {"response_mime_type": "application/json"}
-            response = await self.model.generate_content_async(prompt, generation_config=generation_config)
-            return response.text
+            response_text = await _stream_planner_response(self.model, prompt, sink)
         except Exception as e:
             logger.error(f"Gemini API call failed: {e}")
-            return json.dumps({"thought": "A critical error occurred with the LLM. I must finish now.", "action": {"tool_name": "finish", "parameters": {"gathered_data": self.gathered_data}}})
\ No newline at end of file
+            return _dumps({"thought": "A critical error occurred with the LLM. I must finish now.", "action": {"tool_name": "finish", "parameters": {"gathered_data": self.gathered_data}}}), False
+        if _is_planner_response(response_text):
+            await llm_cache.put(cache_key, response_text)
+        return response_text, False
\ No newline at end of file
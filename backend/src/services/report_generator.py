@@ -1,10 +1,14 @@
 import google.generativeai as genai
 from typing import List, Dict, Any, AsyncGenerator
 from loguru import logger
+from collections import OrderedDict
+from itertools import islice
 import json
+import time
 
 from src.core.settings import get_settings
 from src.services.search import web_search
+from src.services import llm_cache
 
 settings = get_settings()
 genai.configure(api_key=settings.GEMINI_API_KEY)
@@ -24,32 +28,71 @@ async def get_corporate_profile_via_search(brand_name: str) -> Dict[str, Any]:
 # --- Analysis Functions (Unchanged) ---
 def calculate_affinity_overlap(acquirer_data: List[Dict], target_data: List[Dict]) -> float:
     if not acquirer_data or not target_data: return 0.0
-    acquirer_interests = {item.get('name') for item in acquirer_data if item.get('name')}
-    target_interests = {item.get('name') for item in target_data if item.get('name')}
+    acquirer_interests = {name for item in acquirer_data if (name := item.get('name'))}
+    target_interests = {name for item in target_data if (name := item.get('name'))}
+    # |A ∪ B| = |A| + |B| - |A ∩ B|; set.intersection already iterates the smaller set.
     intersection = len(acquirer_interests.intersection(target_interests))
-    union = len(acquirer_interests.union(target_interests))
+    union = len(acquirer_interests) + len(target_interests) - intersection
     return round((intersection / union) * 100, 2) if union > 0 else 0.0
 def find_culture_clashes(acquirer_data: List[Dict], target_data: List[Dict]) -> List[Dict[str, Any]]:
-    acquirer_interests = {item.get('name') for item in acquirer_data if item.get('name')}
-    target_interests = {item.get('name') for item in target_data if item.get('name')}
+    if not acquirer_data or not target_data: return []
+    acquirer_interests = {name for item in acquirer_data if (name := item.get('name'))}
+    target_interests = {name for item in target_data if (name := item.get('name'))}
+    if acquirer_interests == target_interests: return []
     unique_to_acquirer = acquirer_interests - target_interests
     unique_to_target = target_interests - acquirer_interests
     clashes = []
-    for interest in list(unique_to_acquirer)[:5]:
+    for interest in islice(unique_to_acquirer, 5):
         clashes.append({"topic": interest, "description": "Audience shows strong affinity for this, a taste not shared by the Target's audience.", "severity": "MEDIUM"})
-    for interest in list(unique_to_target)[:5]:
+    for interest in islice(unique_to_target, 5):
          clashes.append({"topic": interest, "description": "Audience shows strong affinity for this, a taste not shared by the Acquirer's audience.", "severity": "HIGH"})
     return clashes
 def find_untapped_growth(acquirer_data: List[Dict], target_data: List[Dict]) -> List[Dict[str, Any]]:
     #...
-    acquirer_interests = {item.get('name') for item in acquirer_data if item.get('name')}
-    target_interests = {item.get('name') for item in target_data if item.get('name')}
+    acquirer_interests = {name for item in acquirer_data if (name := item.get('name'))}
+    target_interests = {name for item in target_data if (name := item.get('name'))}
+    # isdisjoint stops at the first common taste; most unrelated pairs share none.
+    if acquirer_interests.isdisjoint(target_interests): return []
     shared_interests = acquirer_interests.intersection(target_interests)
     opportunities = []
-    for interest in list(shared_interests)[:5]:
+    for interest in islice(shared_interests, 5):
         opportunities.append({"description": f"Both audiences show a strong affinity for '{interest}'. This shared passion point could be a key pillar for joint marketing campaigns and product integrations post-acquisition.", "potential_impact_score": 8})
     return opportunities
 
+CHAT_SYSTEM_INSTRUCTION = "You are an expert M&A analyst acting as a follow-up assistant. Your sole task is to answer questions based *only* on the provided report context, conversation history, and any live web search results provided for the current query. Do not use any outside knowledge or make up information. If the answer is not in the provided materials, state that clearly. Provide concise, professional answers. Format your response using Markdown."
+
+_ASSISTANT_ROLES = frozenset(("assistant", "bot"))
+# Longer conversations keep their first message and the most recent turns; the report context
+# travels in the system instruction, so older turns add cost without adding grounding.
+CHAT_MAX_HISTORY_MESSAGES = 30
+# Streamed answer text is sent once this much has accumulated or this long has passed.
+CHAT_FLUSH_CHARS = 512
+CHAT_FLUSH_INTERVAL = 0.05
+
+# Each model holds its report context, so only the reports currently being chatted about are kept;
+# they are keyed by a digest so the multi-KB context isn't pinned a second time as the key.
+CHAT_MODEL_CACHE_SIZE = 8
+_chat_models: "OrderedDict[str, genai.GenerativeModel]" = OrderedDict()
+
+def _get_chat_model(report_context: str) -> genai.GenerativeModel:
+    """
+    One model per report, with the instructions and report context as its system instruction.
+    Every turn of a conversation then starts with the same prefix, which Gemini can reuse
+    across turns, and only the new question is formatted per request.
+    """
+    key = llm_cache.make_key("chat-model", report_context)
+    model = _chat_models.get(key)
+    if model is not None:
+        _chat_models.move_to_end(key)
+        return model
+    model = genai.GenerativeModel(
+        settings.GEMINI_MODEL_NAME,
+        system_instruction=f"{CHAT_SYSTEM_INSTRUCTION}\n---\n**INITIAL REPORT CONTEXT:**\n{report_context}\n---",
+    )
+    _chat_models[key] = model
+    if len(_chat_models) > CHAT_MODEL_CACHE_SIZE:
+        _chat_models.popitem(last=False)
+    return model
 
 async def generate_chat_response(
     messages: List[Dict[str, Any]], 
@@ -60,13 +103,20 @@ async def generate_chat_response(
     Generates a conversational response from the LLM, optionally using web search to ground the answer.
     Yields structured JSON events for sources and text chunks.
     """
-    model = genai.GenerativeModel(settings.GEMINI_MODEL_NAME)
+    model = _get_chat_model(report_context)
 
     # 1. Separate history from the new query
-    gemini_history = []
-    for msg in messages[:-1]:
-        role = "model" if msg["role"] in ["assistant", "bot"] else "user"
-        gemini_history.append({'role': role, 'parts': [msg['content']]})
+    gemini_history = [
+        {'role': "model" if msg["role"] in _ASSISTANT_ROLES else "user", 'parts': (msg['content'],)}
+        for msg in messages[:-1]
+    ]
+    if len(gemini_history) > CHAT_MAX_HISTORY_MESSAGES:
+        # Keep the opening question and the latest turns; the tail must start on the other
+        # role so the history still alternates as Gemini requires.
+        first, tail = gemini_history[0], gemini_history[-(CHAT_MAX_HISTORY_MESSAGES - 1):]
+        while tail and tail[0]['role'] == first['role']:
+            tail = tail[1:]
+        gemini_history = [first, *tail]
 
     # 2. Prepare the latest user query and handle grounding
     last_user_message = messages[-1]['content'] if messages else ""
@@ -92,23 +142,33 @@ You should also use the initial report context and our conversation history if n
 
 **MY QUESTION:** {last_user_message}
 """
-    
-    # 3. Add the main system prompt to the first message in a conversation
-    if not gemini_history:
-        final_query_prompt = f"""
-You are an expert M&A analyst acting as a follow-up assistant. Your sole task is to answer questions based *only* on the provided report context, conversation history, and any live web search results provided for the current query. Do not use any outside knowledge or make up information. If the answer is not in the provided materials, state that clearly. Provide concise, professional answers. Format your response using Markdown.
----
-**INITIAL REPORT CONTEXT:**
-{report_context}
----
-{final_query_prompt}
-"""
-    
+
+    # Same report, conversation and prompt (including any search results) -> same answer; replay it whole.
+    cache_key = llm_cache.make_key(settings.GEMINI_MODEL_NAME, "chat", report_context, json.dumps(gemini_history), final_query_prompt)
+    cached = await llm_cache.get(cache_key)
+    if cached is not None:
+        logger.debug("Chat response served from cache.")
+        yield {"type": "chunk", "payload": cached}
+        return
+
     try:
         chat = model.start_chat(history=gemini_history)
         response_stream = await chat.send_message_async(final_query_prompt, stream=True)
+        chunks: List[str] = []
+        sent, pending_chars, last_flush = 0, 0, time.monotonic()
         async for chunk in response_stream:
-            yield {"type": "chunk", "payload": chunk.text}
+            chunks.append(chunk.text)
+            pending_chars += len(chunk.text)
+            now = time.monotonic()
+            # Token-sized chunks are coalesced, so each SSE write carries a readable piece of text
+            # while the first words still go out as soon as they arrive.
+            if pending_chars >= CHAT_FLUSH_CHARS or now - last_flush >= CHAT_FLUSH_INTERVAL:
+                yield {"type": "chunk", "payload": "".join(chunks[sent:])}
+                sent, pending_chars, last_flush = len(chunks), 0, now
+        if sent < len(chunks):
+            yield {"type": "chunk", "payload": "".join(chunks[sent:])}
+        if chunks:
+            await llm_cache.put(cache_key, "".join(chunks))
     except Exception as e:
         logger.error(f"Gemini chat stream failed: {e}")
         yield {"type": "error", "payload": "There was an error processing your request. Please try again."}
\ No newline at end of file
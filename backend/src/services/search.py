@@ -1,13 +1,39 @@
-from tavily import TavilyClient
+import httpx
+import orjson
 from src.core.settings import get_settings
+from src.services import llm_cache
 from loguru import logger
-from typing import Dict, List, Any, TypedDict, Optional
+from typing import Dict, List, TypedDict, Optional
 import google.generativeai as genai
 from urllib.parse import urlparse
 
 settings = get_settings()
 if settings.GEMINI_API_KEY:
     genai.configure(api_key=settings.GEMINI_API_KEY)
+_gemini_model = genai.GenerativeModel(settings.GEMINI_MODEL_NAME)
+
+
+TAVILY_BASE_URL = "https://api.tavily.com"
+# One keep-alive pool for every search, so repeated tool calls reuse the TLS connection.
+_tavily_http: Optional[httpx.AsyncClient] = None
+
+def _get_tavily_http() -> httpx.AsyncClient:
+    global _tavily_http
+    if _tavily_http is None or _tavily_http.is_closed:
+        _tavily_http = httpx.AsyncClient(
+            base_url=TAVILY_BASE_URL,
+            http2=True,
+            headers={"Authorization": f"Bearer {settings.TAVILY_API_KEY}"},
+            limits=httpx.Limits(max_connections=64, max_keepalive_connections=64, keepalive_expiry=75),
+            timeout=httpx.Timeout(60.0, connect=10.0),
+        )
+    return _tavily_http
+
+async def close_http_client() -> None:
+    global _tavily_http
+    if _tavily_http is not None:
+        await _tavily_http.aclose()
+        _tavily_http = None
 
 
 class TavilySearchToolOutput(TypedDict):
@@ -26,27 +52,38 @@ async def web_search(query: str) -> TavilySearchToolOutput:
             "sources": []
         }
 
+    # Identical queries (the same brand's profile across reports and chat follow-ups) reuse the last result.
+    cache_key = llm_cache.make_key("tavily", " ".join(query.lower().split()))
+    cached = await llm_cache.get(cache_key)
+    if cached is not None:
+        logger.debug(f"Tavily search served from cache for query: '{query}'")
+        return orjson.loads(cached)
+
     try:
-        client = TavilyClient(api_key=settings.TAVILY_API_KEY)
-        response = client.search(
-            query=query,
-            search_depth="advanced",
-            max_results=5
-        )
+        resp = await _get_tavily_http().post("/search", json={
+            "query": query,
+            "search_depth": "advanced",
+            "max_results": 5
+        })
+        resp.raise_for_status()
+        response = resp.json()
 
-        # Format the results into a string for the LLM prompt
-        context_str = "\n\n".join(
-            [f"Title: {res['title']}\nURL: {res['url']}\nContent: {res['content']}" for res in response['results']]
-        )
-        
-        # Extract sources for storage and display
-        sources = [{"title": res.get("title", ""), "url": res.get("url", "")} for res in response.get('results', [])]
+        # One pass over the results builds both the LLM context and the sources for storage and display.
+        blocks: List[str] = []
+        sources: List[Dict[str, str]] = []
+        for res in response['results']:
+            blocks.append(f"Title: {res['title']}\nURL: {res['url']}\nContent: {res['content']}")
+            sources.append({"title": res.get("title", ""), "url": res.get("url", "")})
+        context_str = "\n\n".join(blocks)
         
         logger.success(f"Tavily search successful for query: '{query}'")
-        return {
+        result: TavilySearchToolOutput = {
             "context_str": context_str,
             "sources": sources
         }
+        if sources:
+            await llm_cache.put(cache_key, orjson.dumps(result).decode(), ttl=settings.TAVILY_CACHE_TTL)
+        return result
 
     except Exception as e:
         logger.error(f"An error occurred during Tavily search: {e}")
@@ -64,7 +101,7 @@ async def find_official_website(brand_name: str) -> Optional[str]:
         return None
 
     try:
-        model = genai.GenerativeModel(settings.GEMINI_MODEL_NAME)
+        model = _gemini_model
         prompt = f"""
         You are a research assistant. Your only task is to find the official homepage URL for a given company.
         Return ONLY the URL and nothing else. Do not add any explanatory text, markdown, or greetings.
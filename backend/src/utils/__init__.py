@@ -1,44 +1,70 @@
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, suppress
 from fastapi import FastAPI
 from loguru import logger
+import asyncio
+import sys
 import time
 from src.db.postgresql import postgres_db
 from src.core.settings import get_settings
-from src.db.models import rebuild_all_models
+from src.services import llm_cache, react_agent, search
+from src.api.v1 import utils as api_utils
 
 settings = get_settings()
 
+# --- Logging ---
+def setup_logging() -> None:
+    """
+    Replaces loguru's default stderr handler with a queued one: records are handed to a
+    background thread, so request handlers and agent streams never wait on the write itself.
+    """
+    logger.remove()
+    logger.add(sys.stderr, enqueue=True)
+
 # --- Lifespan Manager ---
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    # --- SETUP PHASE ---
-    logger.info(f"Starting up in {settings.ENVIRONMENT} mode...")
+async def _initialize_database(app: FastAPI) -> None:
+    """
+    Verifies the database and creates missing tables. Runs in the background so the server
+    accepts connections (and answers /health/live) while this is still in flight;
+    app.state.startup_complete is set once it succeeds, which flips /health/ready to 200.
+    A failure is recorded in app.state.startup_error and keeps /health/ready at 503.
+    """
     start_time = time.time()
-    
-    # Resolve all model relationships before touching the database.
-    rebuild_all_models()
-
     try:
         await postgres_db.create_db_and_tables()
         logger.info("Database connection and tables verified.")
-
-        # CORE FIX: In development, after recreating the schema, the connection
-        # pool may contain stale connections with invalid prepared statement
-        # caches. Disposing the pool forces new, clean connections to be made.
-        if settings.ENVIRONMENT == "development":
-            logger.warning("DEV MODE: Disposing connection pool to clear caches after schema rebuild.")
-            await postgres_db.engine.dispose()
-            logger.info("Connection pool disposed successfully.")
-
     except Exception as e:
         logger.critical(f"Database connection failed: {e}")
+        app.state.startup_error = str(e)
         if settings.FAIL_FAST:
             raise RuntimeError("Database connection failed.") from e
-
+        return
+    app.state.startup_complete.set()
     logger.info(f"Startup complete in {time.time() - start_time:.2f}s")
-    
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # --- SETUP PHASE ---
+    logger.info(f"Starting up in {settings.ENVIRONMENT} mode...")
+
+    app.state.startup_complete = asyncio.Event()
+    app.state.startup_error = None
+    init_task = asyncio.create_task(_initialize_database(app))
+    if settings.FAIL_FAST:
+        # Refuse to start at all rather than serve without a database.
+        await init_task
+
     # --- APPLICATION RUNNING ---
     yield
     
     # --- SHUTDOWN PHASE ---
-    logger.info("Shutting down...")
\ No newline at end of file
+    logger.info("Shutting down...")
+    # Finish unwinding the startup task before the clients it may still be using are closed.
+    init_task.cancel()
+    with suppress(asyncio.CancelledError):
+        await init_task
+    await llm_cache.close()
+    await search.close_http_client()
+    await react_agent.close_http_client()
+    await api_utils.close_http_client()
+    # Drain records still queued for the background writer.
+    await logger.complete()
\ No newline at end of file
@@ -3,6 +3,7 @@ from httpx import AsyncClient
 from fastapi import status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select
+from sqlalchemy import exists
 
 from src.db import models
 
@@ -14,9 +15,7 @@ async def test_register_user(client: AsyncClient, db_session: AsyncSession):
     assert response.json() == {"message": "User created successfully"}
 
     # Verify user is in the database
-    user = (await db_session.execute(select(models.User).where(models.User.email == "newuser@example.com"))).scalar_one_or_none()
-    assert user is not None
-    assert user.email == "newuser@example.com"
+    assert await db_session.scalar(select(exists().where(models.User.email == "newuser@example.com"))) is True
 
     # Test duplicate email registration
     response = await client.post("/api/v1/auth/register", json={"email": "newuser@example.com", "password": "password123"})
@@ -1,6 +1,10 @@
+import asyncio
 import pytest
 from httpx import AsyncClient
-from fastapi import status
+from fastapi import FastAPI, status
+
+from src.main import app
+from src.utils import _initialize_database, lifespan
 
 @pytest.mark.asyncio
 async def test_health_check(client: AsyncClient):
@@ -8,4 +12,62 @@ async def test_health_check(client: AsyncClient):
     assert response.status_code == status.HTTP_200_OK
     data = response.json()
     assert data["status"] == "ok"
-    assert "version" in data
\ No newline at end of file
+    assert "version" in data
+
+@pytest.mark.asyncio
+async def test_liveness(client: AsyncClient):
+    response = await client.get("/api/v1/health/live")
+    assert response.status_code == status.HTTP_200_OK
+
+@pytest.mark.asyncio
+async def test_readiness_waits_for_startup(client: AsyncClient):
+    app.state.startup_complete = asyncio.Event()
+    try:
+        response = await client.get("/api/v1/health/ready")
+        assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+
+        app.state.startup_complete.set()
+        response = await client.get("/api/v1/health/ready")
+        assert response.status_code == status.HTTP_200_OK
+    finally:
+        del app.state.startup_complete
+
+@pytest.mark.asyncio
+async def test_readiness_stays_unavailable_after_failed_startup(client: AsyncClient, mocker):
+    mocker.patch("src.utils.settings.FAIL_FAST", False)
+    mocker.patch("src.utils.postgres_db.create_db_and_tables", side_effect=ConnectionRefusedError("db down"))
+    app.state.startup_complete = asyncio.Event()
+    app.state.startup_error = None
+    try:
+        await _initialize_database(app)
+        assert not app.state.startup_complete.is_set()
+
+        response = await client.get("/api/v1/health/ready")
+        assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+        assert response.json() == {"status": "failed"}
+    finally:
+        del app.state.startup_complete
+        del app.state.startup_error
+
+@pytest.mark.asyncio
+async def test_shutdown_waits_for_the_cancelled_startup_task(mocker):
+    mocker.patch("src.utils.settings.FAIL_FAST", False)
+    started, cancelled = asyncio.Event(), asyncio.Event()
+
+    async def hang():
+        started.set()
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    mocker.patch("src.utils.postgres_db.create_db_and_tables", side_effect=hang)
+    startup_unwound_before_close = []
+    close = mocker.AsyncMock(side_effect=lambda: startup_unwound_before_close.append(cancelled.is_set()))
+    for closer in ("llm_cache.close", "search.close_http_client", "react_agent.close_http_client", "api_utils.close_http_client"):
+        mocker.patch(f"src.utils.{closer}", close)
+
+    async with lifespan(FastAPI()):
+        await started.wait()
+    assert startup_unwound_before_close == [True] * 4
@@ -2,7 +2,7 @@ import pytest
 from httpx import AsyncClient
 from fastapi import status
 from sqlalchemy.ext.asyncio import AsyncSession
-import json
+import orjson
 import uuid
 
 from src.db import models
@@ -27,9 +27,10 @@ async def test_create_and_get_reports(authorized_client: AsyncClient, test_user:
         target_brand="Target",
         status=models.ReportStatus.COMPLETED
     )
+    # The UUID primary key is generated client-side and the session keeps attributes after
+    # commit, so no refresh round-trip is needed to read the id back.
     db_session.add(completed_report)
     await db_session.commit()
-    await db_session.refresh(completed_report)
 
     # Get all non-draft reports for the user
     response = await authorized_client.get("/api/v1/reports/")
@@ -49,7 +50,6 @@ async def test_delete_report(authorized_client: AsyncClient, test_user: models.U
     report_to_delete = models.Report(user_id=test_user.id, status=models.ReportStatus.COMPLETED)
     db_session.add(report_to_delete)
     await db_session.commit()
-    await db_session.refresh(report_to_delete)
     report_id = report_to_delete.id
 
     # Delete the report
@@ -88,7 +88,6 @@ async def test_generate_report_stream_mocked(authorized_client: AsyncClient, tes
     draft_report = models.Report(user_id=test_user.id, status=models.ReportStatus.DRAFT)
     db_session.add(draft_report)
     await db_session.commit()
-    await db_session.refresh(draft_report)
     report_id_to_check = draft_report.id
     
     payload = {"acquirer_brand": "Test Acquirer", "target_brand": "Test Target", "title": "Mock Report"}
@@ -96,9 +95,13 @@ async def test_generate_report_stream_mocked(authorized_client: AsyncClient, tes
     events = []
     async with authorized_client.stream("POST", f"/api/v1/reports/{report_id_to_check}/generate", json=payload, timeout=10) as response:
         response.raise_for_status()
-        async for line in response.aiter_lines():
-            if line.startswith("data:"):
-                events.append(json.loads(line[6:]))
+        buf = bytearray()
+        async for chunk in response.aiter_bytes():
+            buf += chunk
+            while b"\n" in buf:
+                line, _, buf = buf.partition(b"\n")
+                if line.startswith(b"data:"):
+                    events.append(orjson.loads(line[5:]))
 
     # --- Assertions ---
     final_event = events[-1] if events else {}
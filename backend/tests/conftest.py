@@ -1,60 +1,90 @@
-import pytest_asyncio
 import asyncio
-from typing import AsyncGenerator, Generator
+import pytest
+import pytest_asyncio
+from typing import AsyncGenerator
 from httpx import AsyncClient, ASGITransport
 from sqlmodel import SQLModel
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import text
 
 # Set the environment variable to 'test' BEFORE importing the app
 import os
 os.environ['ENVIRONMENT'] = 'test'
+# Under pytest-xdist each worker gets its own schema, so `pytest -n auto` can run in parallel.
+if worker := os.environ.get('PYTEST_XDIST_WORKER'):
+    os.environ['POSTGRES_SCHEMA'] = f"test_{worker}"
 
 from src.main import app
 from src.db.postgresql import postgres_db
 from src.db import models
+from src.core import security
 from src.core.security import get_password_hash, create_access_token
+from passlib.context import CryptContext
+
+# bcrypt's default cost makes every hash/verify take ~250ms. Tests don't need the work factor,
+# so use the minimum rounds and hash the shared fixture password only once.
+security.pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=4)
+TEST_USER_EMAIL = "test@example.com"
+TEST_USER_HASHED_PASSWORD = get_password_hash("testpassword")
 
 # --- Core Fixtures ---
+@pytest.fixture(scope="session")
+def event_loop_policy() -> asyncio.AbstractEventLoopPolicy:
+    """Runs the suite on uvloop, like the server, where it is available (not on Windows)."""
+    try:
+        import uvloop
+    except ImportError:
+        return asyncio.DefaultEventLoopPolicy()
+    return uvloop.EventLoopPolicy()
+
+# Tests share one event loop (see pytest.ini), so the engine's pooled connections stay usable
+# across tests and the schema is only created once per run.
 @pytest_asyncio.fixture(scope="session")
-def event_loop() -> Generator[asyncio.AbstractEventLoop, None, None]:
-    """Create an instance of the default event loop for each test session."""
-    loop = asyncio.get_event_loop_policy().new_event_loop()
-    yield loop
-    loop.close()
+async def db_schema() -> AsyncGenerator[None, None]:
+    """Creates all tables once for the test session and drops them at the end."""
+    async with postgres_db.engine.begin() as conn:
+        await conn.execute(text(f"CREATE SCHEMA IF NOT EXISTS {postgres_db.schema}"))
+        await conn.run_sync(SQLModel.metadata.drop_all) # Drop first to be safe
+        await conn.run_sync(SQLModel.metadata.create_all)
+    yield
+    async with postgres_db.engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.drop_all)
+        if postgres_db.schema != "public":
+            await conn.execute(text(f"DROP SCHEMA IF EXISTS {postgres_db.schema} CASCADE"))
+    await postgres_db.engine.dispose()
 
 @pytest_asyncio.fixture(scope="function")
-async def db_session() -> AsyncGenerator[asyncio.AbstractEventLoop, None]:
+async def db_session(db_schema: None) -> AsyncGenerator[AsyncSession, None]:
     """
     Fixture to provide a database session for a test.
-    This will create all tables before the test and drop them after,
-    ensuring a clean slate for each test function.
+    Every table is truncated first, so each test starts from a clean slate
+    without paying for DDL.
     """
-    # Establish connection and create tables
     async with postgres_db.engine.begin() as conn:
-        await conn.run_sync(SQLModel.metadata.drop_all) # Drop first to be safe
-        await conn.run_sync(SQLModel.metadata.create_all)
+        tables = ", ".join(conn.dialect.identifier_preparer.format_table(table) for table in SQLModel.metadata.sorted_tables)
+        await conn.execute(text(f"TRUNCATE {tables} RESTART IDENTITY CASCADE"))
 
-    # Yield the session to the test
     async with postgres_db.get_session() as session:
         yield session
 
-    # After the test, drop all tables to ensure isolation
-    async with postgres_db.engine.begin() as conn:
-        await conn.run_sync(SQLModel.metadata.drop_all)
-    
-    # Dispose the engine to close all connections
-    await postgres_db.engine.dispose()
 
+@pytest_asyncio.fixture(scope="session")
+async def _shared_client() -> AsyncGenerator[AsyncClient, None]:
+    """One HTTPX client and ASGI transport for the whole session."""
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as c:
+        yield c
 
 @pytest_asyncio.fixture(scope="function")
-async def client(db_session: AsyncSession) -> AsyncGenerator[AsyncClient, None]:
+async def client(_shared_client: AsyncClient, db_session: AsyncSession) -> AsyncGenerator[AsyncClient, None]:
     """
     Fixture to provide an HTTPX client for making requests to the test app.
-    It depends on db_session to ensure the database is ready.
+    It depends on db_session to ensure the database is ready. The client is shared
+    across the session, so per-test auth state is cleared on the way in.
     """
-    transport = ASGITransport(app=app)
-    async with AsyncClient(transport=transport, base_url="http://test") as c:
-        yield c
+    _shared_client.headers.pop("Authorization", None)
+    _shared_client.cookies.clear()
+    yield _shared_client
 
 # --- Test User and Authentication Fixtures ---
 
@@ -62,9 +92,9 @@ async def client(db_session: AsyncSession) -> AsyncGenerator[AsyncClient, None]:
 async def test_user(db_session: AsyncSession) -> models.User:
     """Fixture to create a standard test user in the database."""
     user = models.User(
-        email="test@example.com",
+        email=TEST_USER_EMAIL,
         full_name="Test User",
-        hashed_password=get_password_hash("testpassword"),
+        hashed_password=TEST_USER_HASHED_PASSWORD,
         is_active=True,
     )
     db_session.add(user)
@@ -72,13 +102,16 @@ async def test_user(db_session: AsyncSession) -> models.User:
     await db_session.refresh(user)
     return user
 
-@pytest_asyncio.fixture(scope="function")
-def test_user_token(test_user: models.User) -> str:
-    """Fixture to create a JWT token for the test user."""
-    return create_access_token(data={"sub": test_user.email})
+@pytest.fixture(scope="session")
+def test_user_token() -> str:
+    """
+    JWT for the test user. It only encodes the email, which is the same for every test,
+    so it is signed once per session; requests using it still need the `test_user` row.
+    """
+    return create_access_token(data={"sub": TEST_USER_EMAIL})
 
 @pytest_asyncio.fixture(scope="function")
-async def authorized_client(client: AsyncClient, test_user_token: str) -> AsyncClient:
+async def authorized_client(client: AsyncClient, test_user: models.User, test_user_token: str) -> AsyncClient:
     """Fixture to provide an authenticated client."""
     client.headers["Authorization"] = f"Bearer {test_user_token}"
     return client
\ No newline at end of file
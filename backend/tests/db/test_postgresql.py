@@ -0,0 +1,23 @@
+import pytest
+from sqlmodel import SQLModel
+from sqlalchemy.sql import text
+
+from src.db.postgresql import postgres_db
+
+@pytest.mark.asyncio
+async def test_create_db_and_tables_skips_when_all_tables_exist(db_schema: None, mocker):
+    create_all = mocker.spy(SQLModel.metadata, "create_all")
+    assert await postgres_db.create_db_and_tables()
+    create_all.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_create_db_and_tables_recreates_missing_table(db_schema: None, mocker):
+    dropped = SQLModel.metadata.sorted_tables[-1]
+    async with postgres_db.engine.begin() as conn:
+        await conn.run_sync(dropped.drop)
+
+    create_all = mocker.spy(SQLModel.metadata, "create_all")
+    assert await postgres_db.create_db_and_tables()
+    create_all.assert_called_once()
+    async with postgres_db.engine.connect() as conn:
+        assert await conn.scalar(text("SELECT to_regclass(:name)"), {"name": f"{postgres_db.schema}.{dropped.name}"})
@@ -0,0 +1,51 @@
+import asyncio
+import time
+from collections import OrderedDict
+
+import pytest
+
+from src.services import llm_cache
+
+
+@pytest.fixture(autouse=True)
+def local_cache(monkeypatch):
+    monkeypatch.setattr(llm_cache, "_local", OrderedDict())
+    monkeypatch.setattr(llm_cache, "_redis", None)
+    monkeypatch.setattr(llm_cache.settings, "REDIS_URL", None)
+
+@pytest.mark.asyncio
+async def test_local_cache_round_trip_and_expiry():
+    key = llm_cache.make_key("model", "prompt")
+    assert await llm_cache.get(key) is None
+
+    await llm_cache.put(key, "value", ttl=60)
+    assert await llm_cache.get(key) == "value"
+
+    await llm_cache.put(key, "stale", ttl=-1)
+    assert await llm_cache.get(key) is None
+
+@pytest.mark.asyncio
+async def test_local_cache_evicts_oldest_entry(monkeypatch):
+    monkeypatch.setattr(llm_cache, "LOCAL_MAX_ENTRIES", 2)
+    for key in ("a", "b", "c"):
+        await llm_cache.put(key, key)
+    assert await llm_cache.get("a") is None
+    assert await llm_cache.get("c") == "c"
+
+@pytest.mark.asyncio
+async def test_unresponsive_redis_degrades_to_a_miss(monkeypatch):
+    # Accepts connections but never answers, like a hung Redis.
+    async def hang(reader, writer):
+        await asyncio.Event().wait()
+
+    server = await asyncio.start_server(hang, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    monkeypatch.setattr(llm_cache.settings, "REDIS_URL", f"redis://127.0.0.1:{port}/0")
+    try:
+        started = time.monotonic()
+        assert await llm_cache.get("key") is None
+        await llm_cache.put("key", "value")
+        assert time.monotonic() - started < 2
+    finally:
+        await llm_cache.close()
+        server.close()
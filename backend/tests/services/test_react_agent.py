@@ -0,0 +1,597 @@
+import asyncio
+import time
+from collections import OrderedDict
+import pytest
+import httpx
+import tenacity
+
+from src.services import react_agent
+
+
+# Long enough that summarization is not skipped as unnecessary.
+LONG_CONTEXT = "Acme sells anvils to coyotes across the desert. " * 40
+
+
+@pytest.fixture(autouse=True)
+def reset_qloo_rate_limit(monkeypatch):
+    monkeypatch.setitem(react_agent._qloo_rate_limit, "remaining", float("inf"))
+    monkeypatch.setitem(react_agent._qloo_rate_limit, "reset_at", 0.0)
+
+@pytest.fixture(autouse=True)
+def disable_speculative_tools(monkeypatch):
+    monkeypatch.setattr(react_agent.settings, "AGENT_SPECULATIVE_TOOLS", False)
+
+def test_qloo_retry_after_parsing():
+    assert react_agent._qloo_retry_after(httpx.Response(429, headers={"Retry-After": "7"})) == 7.0
+    assert react_agent._qloo_retry_after(httpx.Response(429)) == react_agent.QLOO_DEFAULT_RETRY_AFTER
+    assert react_agent._qloo_retry_after(httpx.Response(429, headers={"Retry-After": "garbage"})) == react_agent.QLOO_DEFAULT_RETRY_AFTER
+
+def test_record_qloo_rate_limit_tracks_remaining_and_429():
+    react_agent._record_qloo_rate_limit(httpx.Response(200, headers={"X-RateLimit-Remaining": "42"}))
+    assert react_agent._qloo_rate_limit["remaining"] == 42
+
+    react_agent._record_qloo_rate_limit(httpx.Response(429, headers={"Retry-After": "5"}))
+    assert react_agent._qloo_rate_limit["remaining"] == 0
+    assert react_agent._qloo_rate_limit["reset_at"] > 0
+
+@pytest.mark.asyncio
+async def test_qloo_backpressure_only_sleeps_when_bucket_is_low(mocker):
+    sleep = mocker.patch("src.services.react_agent.asyncio.sleep")
+    await react_agent._qloo_backpressure()
+    sleep.assert_not_called()
+
+    react_agent._qloo_rate_limit["remaining"] = 1
+    await react_agent._qloo_backpressure()
+    sleep.assert_called_once_with(react_agent.QLOO_FALLBACK_PACING)
+
+@pytest.mark.asyncio
+async def test_qloo_backpressure_recovers_after_429_without_remaining_header(mocker):
+    sleep = mocker.patch("src.services.react_agent.asyncio.sleep")
+    responses = iter([httpx.Response(429, headers={"Retry-After": "0"}), httpx.Response(200, json={"results": []})])
+    async with httpx.AsyncClient(transport=httpx.MockTransport(lambda request: next(responses))) as client:
+        with pytest.raises(react_agent._QlooRateLimited):
+            await react_agent._qloo_get.retry_with(stop=tenacity.stop_after_attempt(1))(client, "/search", {"query": "Acme"}, timeout=1.0)
+        resp = await react_agent._qloo_get(client, "/search", {"query": "Acme"}, timeout=1.0)
+        assert resp.status_code == 200
+
+        sleep.reset_mock()
+        await react_agent._qloo_backpressure()
+    sleep.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_qloo_get_retries_rate_limited_requests(mocker):
+    mocker.patch("src.services.react_agent.asyncio.sleep")
+    mocker.patch.object(react_agent._qloo_get.retry, "wait", tenacity.wait_none())
+    responses = iter([httpx.Response(429, headers={"Retry-After": "0"}), httpx.Response(200, json={"results": []})])
+    async with httpx.AsyncClient(transport=httpx.MockTransport(lambda request: next(responses))) as client:
+        resp = await react_agent._qloo_get(client, "/search", {"query": "Acme"}, timeout=1.0)
+    assert resp.status_code == 200
+
+@pytest.mark.asyncio
+async def test_qloo_id_search_uses_one_request_and_falls_back_per_type_on_failure():
+    requests = []
+    def handler(request):
+        requests.append(request.url.params["types"])
+        if "," in request.url.params["types"]:
+            return httpx.Response(400 if request.url.params["query"] == "Globex" else 200, json={"results": [{"id": "acme-id"}]})
+        return httpx.Response(200, json={"results": [{"id": "globex-id"}] if request.url.params["types"] == "urn:entity:person" else []})
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        assert await react_agent._fetch_qloo_id(client, "Acme") == "acme-id"
+        assert len(requests) == 1
+        assert await react_agent._fetch_qloo_id(client, "Globex") == "globex-id"
+    assert requests[1:] == [",".join(react_agent.QLOO_ENTITY_TYPE_LIST), *react_agent.QLOO_ENTITY_TYPE_LIST]
+
+@pytest.mark.asyncio
+async def test_qloo_id_search_does_not_fan_out_while_rate_limited(mocker):
+    mocker.patch("src.services.react_agent.asyncio.sleep")
+    mocker.patch.object(react_agent._qloo_get.retry, "wait", tenacity.wait_none())
+    requests = []
+    def handler(request):
+        requests.append(request.url.params["types"])
+        return httpx.Response(429, headers={"Retry-After": "0"})
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        assert await react_agent._fetch_qloo_id(client, "Acme") is None
+    assert requests == [",".join(react_agent.QLOO_ENTITY_TYPE_LIST)] * 3
+
+@pytest.mark.asyncio
+async def test_qloo_id_search_retries_title_case_once_on_empty_result():
+    queries = []
+    def handler(request):
+        queries.append(request.url.params["query"])
+        return httpx.Response(200, json={"results": [{"id": "jordan-id"}] if request.url.params["query"] == "Air Jordan" else []})
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        assert await react_agent._fetch_qloo_id(client, " air  jordan") == "jordan-id"
+        assert await react_agent._fetch_qloo_id(client, "Nowhere") is None
+    assert queries == ["air jordan", "Air Jordan", "Nowhere"]
+
+@pytest.mark.asyncio
+async def test_qloo_id_search_prefers_types_in_priority_order():
+    results = [
+        {"id": "apple-movie", "types": ["urn:entity:movie"]},
+        {"id": "apple-place", "types": ["urn:entity:place"]},
+        {"id": "apple-brand", "types": ["urn:entity:brand"]},
+        {"id": "apple-brand-2", "types": ["urn:entity:brand"]},
+    ]
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, json={"results": results}))
+    async with httpx.AsyncClient(transport=transport) as client:
+        assert await react_agent._fetch_qloo_id(client, "Apple") == "apple-brand"
+
+@pytest.mark.asyncio
+async def test_drain_stream_yields_deltas_until_tool_finishes():
+    queue = asyncio.Queue()
+
+    async def tool():
+        queue.put_nowait(("q", "Hello "))
+        await asyncio.sleep(0)
+        queue.put_nowait(("q", "world"))
+        return {"context_str": "Hello world"}
+
+    task = asyncio.create_task(tool())
+    deltas = [delta async for _, delta in react_agent._drain_stream(task, queue)]
+    assert "".join(deltas) == "Hello world"
+    assert task.result() == {"context_str": "Hello world"}
+
+def test_dedupe_search_terms_collapses_case_and_corporate_suffixes():
+    terms = ["Apple", "apple", "Apple Inc.", " iPhone ", "iphone", "", None, "Apple Music"]
+    assert react_agent._dedupe_search_terms(terms) == ["Apple", "iPhone", "Apple Music"]
+
+async def _stream_chunks(mocker, texts):
+    for text in texts:
+        yield mocker.Mock(text=text)
+
+@pytest.mark.asyncio
+async def test_planner_response_is_cached_by_exact_prompt(mocker, monkeypatch):
+    monkeypatch.setattr(react_agent.llm_cache, "_local", OrderedDict())
+    agent = react_agent.AlloyReActAgent("Acme", "Globex")
+    chunks = ['{"thought": "t", "action": {"tool_', 'name": "finish", "parameters": {}}}']
+    generate = mocker.patch.object(agent.model, "generate_content_async", mocker.AsyncMock(return_value=_stream_chunks(mocker, chunks)))
+
+    assert await agent._get_llm_response("prompt") == ("".join(chunks), False)
+    assert await agent._get_llm_response("prompt") == ("".join(chunks), True)
+    generate.assert_awaited_once()
+
+@pytest.mark.asyncio
+async def test_planner_stream_reports_tool_before_response_completes(mocker, monkeypatch):
+    monkeypatch.setattr(react_agent.llm_cache, "_local", OrderedDict())
+    agent = react_agent.AlloyReActAgent("Acme", "Globex")
+    chunks = ['{"thought": "say \\"hi', '\\"", "action": {"tool_name": "web', '_search", ', '"parameters": {"query": "Acme"}}}']
+    mocker.patch.object(agent.model, "generate_content_async", mocker.AsyncMock(return_value=_stream_chunks(mocker, chunks)))
+    queue: asyncio.Queue = asyncio.Queue()
+    token = react_agent._planner_stream.set(queue)
+    try:
+        await agent._get_llm_response("prompt")
+    finally:
+        react_agent._planner_stream.reset(token)
+
+    events = [queue.get_nowait() for _ in range(queue.qsize())]
+    assert [e["status"] for e in events] == ["thought", "planned_tool"]
+    assert events[0]["message"] == 'say "hi"'
+    assert events[1]["tool_name"] == "web_search"
+
+@pytest.mark.asyncio
+async def test_planner_stream_skips_an_undecodable_thought_preview(mocker, monkeypatch):
+    monkeypatch.setattr(react_agent.llm_cache, "_local", OrderedDict())
+    agent = react_agent.AlloyReActAgent("Acme", "Globex")
+    chunks = ['{"thought": "Acme\\x27s turn", ', '"action": {"tool_name": "web_search", "parameters": {"query": "Acme"}}}']
+    mocker.patch.object(agent.model, "generate_content_async", mocker.AsyncMock(return_value=_stream_chunks(mocker, chunks)))
+    queue: asyncio.Queue = asyncio.Queue()
+    token = react_agent._planner_stream.set(queue)
+    try:
+        response_text, _ = await agent._get_llm_response("prompt")
+    finally:
+        react_agent._planner_stream.reset(token)
+
+    assert response_text == "".join(chunks)
+    assert [queue.get_nowait()["status"] for _ in range(queue.qsize())] == ["planned_tool"]
+
+def test_tool_cache_key_is_per_brand_and_skips_deal_specific_tools():
+    key = react_agent._tool_cache_key("corporate_culture_tool", {"brand_name": "Apple Inc."})
+    assert key == react_agent._tool_cache_key("corporate_culture_tool", {"brand_name": " apple "})
+    assert key != react_agent._tool_cache_key("financial_and_market_tool", {"brand_name": "Apple"})
+    assert react_agent._tool_cache_key("intelligent_cultural_analysis_tool", {"acquirer_brand_name": "Apple"}) is None
+    assert react_agent._tool_cache_key("web_search", {}) is None
+
+@pytest.mark.asyncio
+async def test_parallel_action_runs_every_tool_in_one_turn(mocker, monkeypatch):
+    monkeypatch.setattr(react_agent.llm_cache, "_local", OrderedDict())
+    agent = react_agent.AlloyReActAgent("Acme", "Globex", "Focus on retail overlap.")
+    parallel = {"parallel": [
+        {"tool_name": "corporate_culture_tool", "parameters": {"brand_name": "Acme"}},
+        {"tool_name": "corporate_culture_tool", "parameters": {"brand_name": "Globex"}},
+        {"tool_name": "nonexistent_tool", "parameters": {}},
+    ]}
+    mocker.patch.object(react_agent.AlloyReActAgent, "_get_llm_response", mocker.AsyncMock(side_effect=[
+        (react_agent.json.dumps({"thought": "t", "action": parallel}), False),
+        (react_agent.json.dumps({"thought": "t", "action": {"tool_name": "finish", "parameters": {}}}), False),
+    ]))
+    culture_tool = mocker.AsyncMock(side_effect=lambda brand_name: {"context_str": f"{brand_name} culture", "sources": []})
+    agent.tools["corporate_culture_tool"] = culture_tool
+
+    events = [event async for event in agent.run_stream()]
+
+    assert culture_tool.await_count == 2
+    assert {"searched_acquirer_culture", "searched_target_culture"} <= agent.completed_steps
+    assert agent.final_data["target_culture_profile"] == "Globex culture"
+    assert "Unknown tool 'nonexistent_tool'" in agent._build_prompt()
+    assert events[-1] == {"status": "complete"}
+
+def test_scratchpad_keeps_a_bounded_window_of_previews():
+    agent = react_agent.AlloyReActAgent("Acme", "Globex")
+    for i in range(react_agent.SCRATCHPAD_WINDOW + 2):
+        agent._log_step({"tool_name": "web_search", "parameters": {"query": f"q{i}"}}, "x" * 2000)
+
+    prompt = agent._build_prompt()
+    assert len(agent.scratchpad) == react_agent.SCRATCHPAD_WINDOW
+    assert "(2 earlier actions omitted" in prompt
+    assert '"q0"' not in prompt and '"q6"' in prompt
+    assert "x" * (react_agent.OBSERVATION_PREVIEW_CHARS + 1) not in prompt
+
+@pytest.mark.asyncio
+async def test_sources_are_deduplicated_by_url():
+    agent = react_agent.AlloyReActAgent("Acme", "Globex")
+    hit = {"title": "Acme", "url": "https://acme.example"}
+    other = {"title": "Acme news", "url": "https://acme.example/news"}
+    for _ in range(2):
+        await agent._apply_observation("corporate_culture_tool", {"brand_name": "Acme"}, {"context_str": "c", "sources": [hit, other]})
+
+    assert agent.all_sources["acquirer_culture_sources"] == [hit, other]
+    assert agent._unstreamed_sources([hit]) == [hit]
+    assert agent._unstreamed_sources([hit, other]) == [other]
+
+def test_sources_are_capped_per_key(monkeypatch):
+    monkeypatch.setattr(react_agent, "MAX_SOURCES_PER_KEY", 3)
+    agent = react_agent.AlloyReActAgent("Acme", "Globex")
+    agent._record_sources("acquirer_sources", [{"title": str(i), "url": f"https://acme.example/{i}"} for i in range(5)])
+
+    assert [source["title"] for source in agent.all_sources["acquirer_sources"]] == ["0", "1", "2"]
+
+@pytest.mark.asyncio
+async def test_large_observations_are_parsed_off_the_event_loop(mocker):
+    payload = react_agent._dumps({"blob": "x" * react_agent.OFFLOOP_PARSE_THRESHOLD})
+    run_in_executor = mocker.spy(asyncio.get_running_loop(), "run_in_executor")
+
+    assert await react_agent._loads_offloop('{"small": true}') == {"small": True}
+    run_in_executor.assert_not_called()
+    assert (await react_agent._loads_offloop(payload))["blob"].startswith("x")
+    run_in_executor.assert_called_once()
+
+@pytest.mark.asyncio
+async def test_planner_retries_transient_gemini_errors(mocker, monkeypatch):
+    monkeypatch.setattr(react_agent.llm_cache, "_local", OrderedDict())
+    mocker.patch.object(react_agent._open_planner_stream.retry, "wait", tenacity.wait_none())
+    agent = react_agent.AlloyReActAgent("Acme", "Globex")
+    text = '{"thought": "t", "action": {"tool_name": "finish", "parameters": {}}}'
+    generate = mocker.patch.object(agent.model, "generate_content_async", mocker.AsyncMock(side_effect=[
+        react_agent.google_exceptions.ServiceUnavailable("busy"),
+        _stream_chunks(mocker, [text]),
+    ]))
+
+    assert await agent._get_llm_response("retry prompt") == (text, False)
+    assert generate.await_count == 2
+
+@pytest.mark.asyncio
+async def test_planner_does_not_replay_events_after_a_mid_stream_error(mocker, monkeypatch):
+    monkeypatch.setattr(react_agent.llm_cache, "_local", OrderedDict())
+    agent = react_agent.AlloyReActAgent("Acme", "Globex")
+
+    async def broken_stream():
+        yield mocker.Mock(text='{"thought": "t", "action": {"tool_name": "web_search", ')
+        raise react_agent.google_exceptions.ServiceUnavailable("dropped")
+
+    generate = mocker.patch.object(agent.model, "generate_content_async", mocker.AsyncMock(return_value=broken_stream()))
+    queue: asyncio.Queue = asyncio.Queue()
+    token = react_agent._planner_stream.set(queue)
+    try:
+        response_text, _ = await agent._get_llm_response("prompt")
+    finally:
+        react_agent._planner_stream.reset(token)
+
+    assert generate.await_count == 1
+    assert [queue.get_nowait()["status"] for _ in range(queue.qsize())] == ["thought", "planned_tool"]
+    assert '"finish"' in response_text
+
+@pytest.mark.asyncio
+async def test_analysis_observations_must_be_json_objects():
+    agent = react_agent.AlloyReActAgent("Acme", "Globex")
+    await agent._apply_observation("persona_expansion_tool", {}, {"context_str": '["not", "an", "object"]'})
+    assert agent.gathered_data["persona_expansion"] == {"error": '["not", "an", "object"]'}
+
+    await agent._apply_observation("persona_expansion_tool", {}, {"context_str": '{"expansion_score": 7}'})
+    assert agent.gathered_data["persona_expansion"] == {"expansion_score": 7}
+
+@pytest.mark.asyncio
+async def test_run_finishes_without_planner_once_all_steps_are_done(mocker, monkeypatch):
+    monkeypatch.setattr(react_agent.llm_cache, "_local", OrderedDict())
+    agent = react_agent.AlloyReActAgent("Acme", "Globex", "Focus on retail overlap.")
+    agent.completed_steps.update(react_agent.REQUIRED_STEPS - {"performed_persona_expansion"})
+    planner = mocker.patch.object(react_agent.AlloyReActAgent, "_get_llm_response", mocker.AsyncMock(return_value=(
+        react_agent.json.dumps({"thought": "t", "action": {"tool_name": "persona_expansion_tool", "parameters": {"acquirer_brand_name": "Acme", "target_brand_name": "Globex"}}}), False
+    )))
+    agent.tools["persona_expansion_tool"] = mocker.AsyncMock(return_value={"context_str": '{"expansion_score": 5}'})
+
+    events = [event async for event in agent.run_stream()]
+
+    planner.assert_awaited_once()
+    assert events[-1] == {"status": "complete"}
+    assert agent.final_data["persona_expansion"] == {"expansion_score": 5}
+
+@pytest.mark.asyncio
+async def test_summaries_are_cached_by_prompt(mocker, monkeypatch):
+    monkeypatch.setattr(react_agent.llm_cache, "_local", OrderedDict())
+    summary_model = react_agent._get_model(react_agent.settings.GEMINI_MODEL_NAME, react_agent.SUMMARY_INSTRUCTIONS)
+    generate = mocker.patch.object(summary_model, "generate_content_async", mocker.AsyncMock(return_value=_stream_chunks(mocker, ["Acme ", "makes anvils."])))
+
+    assert await react_agent._summarize_with_gemini(LONG_CONTEXT, "Acme profile") == "Acme makes anvils."
+    queue: asyncio.Queue = asyncio.Queue()
+    token = react_agent._summary_stream.set(queue)
+    try:
+        assert await react_agent._summarize_with_gemini(LONG_CONTEXT, "Acme profile") == "Acme makes anvils."
+    finally:
+        react_agent._summary_stream.reset(token)
+
+    generate.assert_awaited_once()
+    assert queue.get_nowait() == ("Acme profile", "Acme makes anvils.")
+
+@pytest.mark.asyncio
+async def test_proxy_extraction_covers_both_brands_in_one_call(mocker, monkeypatch):
+    monkeypatch.setattr(react_agent.llm_cache, "_local", OrderedDict())
+    proxy_model = react_agent._get_model(react_agent.settings.GEMINI_MODEL_NAME, react_agent.PROXY_EXTRACTION_INSTRUCTIONS)
+    response = mocker.Mock(text='{"acquirer": ["Anvil", 3], "target": ["Rocket Skates"]}')
+    acme_text = "Acme sells the Anvil to coyotes. " + "filler " * 30
+    globex_text = "Globex makes Rocket Skates for everyone. " + "filler " * 30
+    generate = mocker.patch.object(proxy_model, "generate_content_async", mocker.AsyncMock(return_value=response))
+
+    for _ in range(2):
+        assert await react_agent._extract_cultural_proxies_pair(acme_text, "Acme", globex_text, "Globex") == (["Anvil"], ["Rocket Skates"])
+    generate.assert_awaited_once()
+    prompt = generate.await_args.args[0]
+    assert "Rocket Skates" in prompt and "filler" not in prompt
+
+    assert await react_agent._extract_cultural_proxies_pair("No information found from web search.", "Acme", "", "Globex") == ([], [])
+    generate.assert_awaited_once()
+
+def test_entity_candidates_rank_capitalized_phrases_by_frequency():
+    text = "The iPhone 15 and the Apple Watch sold well. " * 3 + "In Cupertino, Apple Watch fans queued. " + "word " * 30
+    assert react_agent._entity_candidates(text, "Apple Inc.")[:3] == ["Apple Watch", "iPhone 15", "Cupertino"]
+    assert react_agent._entity_candidates("Too short to matter.", "Apple") == []
+
+def test_entity_candidates_skip_search_context_labels_and_the_brand():
+    context = "\n\n".join(
+        f"Title: Nike and Michael Jordan\nURL: https://example.com/Nike/News-{i}\nContent: Nike signed Michael Jordan for Air Jordan sneakers. " + "word " * 10
+        for i in range(5)
+    )
+    candidates = react_agent._entity_candidates(context, "Nike")
+    assert candidates[:2] == ["Michael Jordan", "Air Jordan"]
+    assert not {"Nike", "Title", "URL", "Content"} & set(candidates)
+
+@pytest.mark.asyncio
+async def test_web_search_semantic_cache_only_matches_the_same_brand(mocker, monkeypatch):
+    monkeypatch.setattr(react_agent, "_semantic_search_cache", {})
+    mocker.patch("src.services.react_agent._embed_query", mocker.AsyncMock(return_value=[1.0, 0.0]))
+    fetch = mocker.patch("src.services.react_agent._web_search_fetch", mocker.AsyncMock(return_value={"context_str": "ctx", "sources": []}))
+    mocker.patch("src.services.react_agent._web_search_summarize", mocker.AsyncMock(
+        side_effect=lambda result, query: {"context_str": query, "sources": [{"title": query, "url": "https://example.com"}]}
+    ))
+
+    assert react_agent._query_entities("Apple Inc. company profile") == react_agent._query_entities("overview of Apple")
+    first = await react_agent._web_search_tool("Apple Inc. company profile")
+    assert await react_agent._web_search_tool("company profile of Apple") == first
+    other = await react_agent._web_search_tool("Samsung company profile")
+
+    assert other["context_str"] == "Samsung company profile"
+    assert fetch.await_count == 2
+
+@pytest.mark.asyncio
+async def test_web_search_semantic_hit_skips_the_search_and_expired_entries_do_not(mocker, monkeypatch):
+    monkeypatch.setattr(react_agent, "_semantic_search_cache", {})
+    monkeypatch.setattr(react_agent, "_web_search_inflight", OrderedDict())
+
+    async def embed(query):
+        await asyncio.sleep(0)
+        return [1.0, 0.0]
+
+    mocker.patch("src.services.react_agent._embed_query", side_effect=embed)
+    search = mocker.patch("src.services.react_agent.web_search", mocker.AsyncMock(return_value={"context_str": "ctx", "sources": []}))
+    mocker.patch("src.services.react_agent._web_search_summarize", mocker.AsyncMock(
+        side_effect=lambda result, query: {"context_str": query, "sources": [{"title": query, "url": "https://example.com"}]}
+    ))
+
+    first = await react_agent._web_search_tool("Apple company profile")
+    assert await react_agent._web_search_tool("Apple company profile") == first
+    await asyncio.sleep(0)
+    search.assert_awaited_once()
+
+    (expires_at, vector, result), = react_agent._semantic_search_cache[react_agent._query_entities("Apple")]
+    react_agent._semantic_search_cache[react_agent._query_entities("Apple")] = [(time.monotonic() - 1, vector, result)]
+    await react_agent._web_search_tool("Apple company profile")
+    assert search.await_count == 2
+    assert len(react_agent._semantic_search_cache[react_agent._query_entities("Apple")]) == 1
+
+@pytest.mark.asyncio
+async def test_qloo_id_lookups_are_shared_and_failures_are_not_cached(mocker, monkeypatch):
+    monkeypatch.setattr(react_agent, "_qloo_id_lookups", OrderedDict())
+    fetch = mocker.patch("src.services.react_agent._fetch_qloo_id", mocker.AsyncMock(side_effect=["qloo-1", None, "qloo-2"]))
+
+    results = await asyncio.gather(react_agent._find_qloo_id(None, "Acme"), react_agent._find_qloo_id(None, "acme inc."))
+    assert results == ["qloo-1", "qloo-1"]
+    assert await react_agent._find_qloo_id(None, "Globex") is None
+    assert await react_agent._find_qloo_id(None, "Globex") == "qloo-2"
+    assert fetch.await_count == 3
+
+    expires_at, future = react_agent._qloo_id_lookups["acme"]
+    react_agent._qloo_id_lookups["acme"] = (expires_at - react_agent.SINGLE_FLIGHT_TTL - 1, future)
+    fetch.side_effect = ["qloo-3"]
+    assert await react_agent._find_qloo_id(None, "Acme") == "qloo-3"
+
+@pytest.mark.asyncio
+async def test_concurrent_tools_share_one_brand_pair_profile(mocker, monkeypatch):
+    monkeypatch.setattr(react_agent, "_profile_pair_inflight", OrderedDict())
+    profile = ({"context_str": "a"}, {"context_str": "b"}, ["Anvil"], ["Rocket Skates"])
+    fetch = mocker.patch("src.services.react_agent._fetch_brand_pair_profile", mocker.AsyncMock(return_value=profile))
+
+    results = await asyncio.gather(react_agent._profile_brand_pair("Acme", "Globex"), react_agent._profile_brand_pair("Acme Inc.", "globex"))
+    assert results == [profile, profile]
+    fetch.assert_awaited_once()
+
+    await react_agent._profile_brand_pair("Acme", "Globex")
+    assert fetch.await_count == 2
+
+@pytest.mark.asyncio
+async def test_tastes_are_fetched_once_per_distinct_qloo_id(mocker):
+    mocker.patch("src.services.react_agent._find_qloo_id", mocker.AsyncMock(side_effect=lambda client, term: {"Acme": "a", "Anvil": "a", "Globex": "g"}.get(term)))
+    tastes = mocker.patch("src.services.react_agent._get_tastes_for_entity", mocker.AsyncMock(side_effect=lambda client, qloo_id: {qloo_id.upper()}))
+
+    ids = await react_agent._find_qloo_ids(None, ["Acme", "Anvil", "Unknown", "Globex"])
+    assert ids == ["a", "a", None, "g"]
+    assert await react_agent._get_tastes_for_ids(None, [i for i in ids if i]) == {"a": {"A"}, "g": {"G"}}
+    assert tastes.await_count == 2
+
+@pytest.mark.asyncio
+async def test_speculative_tool_results_are_reused_by_the_planner(mocker, monkeypatch):
+    monkeypatch.setattr(react_agent.settings, "AGENT_SPECULATIVE_TOOLS", True)
+    monkeypatch.setattr(react_agent.llm_cache, "_local", OrderedDict())
+    agent = react_agent.AlloyReActAgent("Acme", "Globex", "Focus on retail overlap.")
+    culture_tool = mocker.AsyncMock(side_effect=lambda brand_name: {"context_str": f"{brand_name} culture", "sources": []})
+    financial_tool = mocker.AsyncMock(return_value={"context_str": "financials", "sources": []})
+    agent.tools.update(corporate_culture_tool=culture_tool, financial_and_market_tool=financial_tool)
+    responses = iter([
+        {"tool_name": "corporate_culture_tool", "parameters": {"brand_name": "Acme"}},
+        {"tool_name": "finish", "parameters": {}},
+    ])
+    async def planner(self, prompt):
+        await asyncio.sleep(0)
+        return react_agent.json.dumps({"thought": "t", "action": next(responses)}), False
+    mocker.patch.object(react_agent.AlloyReActAgent, "_get_llm_response", planner)
+
+    events = [event async for event in agent.run_stream()]
+
+    assert events[-1] == {"status": "complete"}
+    assert sorted(call.kwargs["brand_name"] for call in culture_tool.await_args_list) == ["Acme", "Globex"]
+    assert financial_tool.await_count == 2
+    assert agent.gathered_data["acquirer_culture_profile"] == "Acme culture"
+    assert not agent._speculative_results
+
+@pytest.mark.asyncio
+async def test_qloo_tastes_are_persisted_in_the_shared_cache(mocker, monkeypatch):
+    monkeypatch.setattr(react_agent.llm_cache, "_local", OrderedDict())
+    monkeypatch.setattr(react_agent, "_qloo_taste_lookups", OrderedDict())
+    fetch = mocker.patch("src.services.react_agent._fetch_tastes_for_entity", mocker.AsyncMock(return_value=frozenset({"jazz", "hiking"})))
+
+    assert await react_agent._get_tastes_for_entity(None, "qloo-1") == {"jazz", "hiking"}
+    react_agent._qloo_taste_lookups.clear()
+    assert await react_agent._get_tastes_for_entity(None, "qloo-1") == {"jazz", "hiking"}
+    fetch.assert_awaited_once()
+
+def test_planner_json_near_misses_are_repaired_locally():
+    fenced = 'Here you go:\n```json\n{"thought": "t", "action": {"tool_name": "finish", "parameters": {},},}\n```'
+    assert react_agent._parse_planner_json(fenced) == {"thought": "t", "action": {"tool_name": "finish", "parameters": {}}}
+    with pytest.raises(react_agent.json.JSONDecodeError):
+        react_agent._parse_planner_json("no json here")
+
+@pytest.mark.asyncio
+async def test_run_without_user_context_executes_the_whole_workflow_in_one_batch(mocker, monkeypatch):
+    monkeypatch.setattr(react_agent.llm_cache, "_local", OrderedDict())
+    agent = react_agent.AlloyReActAgent("Acme", "Globex")
+    planner = mocker.patch.object(react_agent.AlloyReActAgent, "_get_llm_response", mocker.AsyncMock())
+    brand_tool = mocker.AsyncMock(side_effect=lambda **params: {"context_str": str(params), "sources": []})
+    analysis_tool = mocker.AsyncMock(return_value={"context_str": '{"score": 1}', "sources": []})
+    agent.tools.update(
+        web_search=brand_tool, corporate_culture_tool=brand_tool, financial_and_market_tool=brand_tool,
+        intelligent_cultural_analysis_tool=analysis_tool, persona_expansion_tool=analysis_tool,
+    )
+
+    events = [event async for event in agent.run_stream()]
+
+    planner.assert_not_awaited()
+    assert events[-1] == {"status": "complete"}
+    assert agent.completed_steps == react_agent.REQUIRED_STEPS
+    assert brand_tool.await_count == 6 and analysis_tool.await_count == 2
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_summaries_share_one_gemini_call(mocker, monkeypatch):
+    monkeypatch.setattr(react_agent.llm_cache, "_local", OrderedDict())
+    monkeypatch.setattr(react_agent, "_summary_inflight", OrderedDict())
+    summary_model = react_agent._get_model(react_agent.settings.GEMINI_MODEL_NAME, react_agent.SUMMARY_INSTRUCTIONS)
+    generate = mocker.patch.object(summary_model, "generate_content_async", mocker.AsyncMock(return_value=_stream_chunks(mocker, ["Acme ", "makes anvils."])))
+
+    async def summarize_into(queue):
+        token = react_agent._summary_stream.set(queue)
+        try:
+            return await react_agent._summarize_with_gemini(LONG_CONTEXT, "Acme profile")
+        finally:
+            react_agent._summary_stream.reset(token)
+
+    first, second = asyncio.Queue(), asyncio.Queue()
+    assert await asyncio.gather(summarize_into(first), summarize_into(second)) == ["Acme makes anvils."] * 2
+    generate.assert_awaited_once()
+    assert [first.get_nowait() for _ in range(first.qsize())] == [("Acme profile", "Acme "), ("Acme profile", "makes anvils.")]
+    assert [second.get_nowait() for _ in range(second.qsize())] == [("Acme profile", "Acme makes anvils.")]
+
+@pytest.mark.asyncio
+async def test_web_search_summary_overlaps_the_next_planner_turn(mocker, monkeypatch):
+    monkeypatch.setattr(react_agent.llm_cache, "_local", OrderedDict())
+    agent = react_agent.AlloyReActAgent("Acme", "Globex", "Focus on retail overlap.")
+    planner_started = asyncio.Event()
+    seen_by_planner = []
+
+    async def plan(self, prompt):
+        seen_by_planner.append(self.gathered_data.get("acquirer_profile"))
+        if len(seen_by_planner) == 1:
+            return react_agent.json.dumps({"thought": "t", "action": {"tool_name": "web_search", "parameters": {"query": "Acme company profile"}}}), False
+        planner_started.set()
+        return react_agent.json.dumps({"thought": "t", "action": {"tool_name": "finish", "parameters": {}}}), False
+
+    async def summarize(result, query):
+        await planner_started.wait()
+        return {"context_str": "Acme makes anvils.", "sources": result["sources"]}
+
+    mocker.patch.object(react_agent.AlloyReActAgent, "_get_llm_response", plan)
+    mocker.patch("src.services.react_agent._embed_query", mocker.AsyncMock(return_value=None))
+    mocker.patch("src.services.react_agent._web_search_fetch", mocker.AsyncMock(
+        return_value={"context_str": LONG_CONTEXT, "sources": [{"title": "Acme", "url": "https://acme.example"}]}
+    ))
+    mocker.patch("src.services.react_agent._web_search_summarize", summarize)
+
+    events = [event async for event in agent.run_stream()]
+
+    assert seen_by_planner == [None, LONG_CONTEXT]
+    assert agent.final_data["acquirer_profile"] == "Acme makes anvils."
+    assert agent._pending_summaries == []
+    assert events[-1] == {"status": "complete"}
+
+@pytest.mark.asyncio
+async def test_tool_results_are_matched_to_brands_case_insensitively():
+    agent = react_agent.AlloyReActAgent("Acme", "Globex", "Focus on retail overlap.")
+    await agent._apply_observation("corporate_culture_tool", {"brand_name": "ACME"}, {"context_str": "acme culture", "sources": []})
+    await agent._apply_observation("web_search", {"query": "globex company profile"}, {"context_str": "globex profile", "sources": []})
+
+    assert agent.gathered_data["acquirer_culture_profile"] == "acme culture"
+    assert agent.gathered_data["target_profile"] == "globex profile"
+
+def test_summary_prompt_caps_the_search_context():
+    prompt = react_agent._summary_prompt("x" * (react_agent.SUMMARY_MAX_CONTEXT_CHARS + 500), "Acme profile")
+
+    assert prompt.count("x") == react_agent.SUMMARY_MAX_CONTEXT_CHARS
+
+def test_prompts_are_sent_without_class_indentation():
+    agent = react_agent.AlloyReActAgent("Acme", "Globex", "Focus on retail overlap.")
+
+    assert agent._build_prompt().startswith("**CURRENT TASK:**\nConduct")
+    assert "\n    " not in react_agent.AlloyReActAgent.PROMPT_TEMPLATE
+    assert react_agent.AlloyReActAgent.SYSTEM_PROMPT.startswith("You are")
+
+@pytest.mark.asyncio
+async def test_short_search_context_is_used_without_summarizing(mocker):
+    generate = mocker.patch.object(react_agent, "_summarize_with_gemini_streaming")
+    queue: asyncio.Queue = asyncio.Queue()
+    token = react_agent._summary_stream.set(queue)
+    try:
+        assert await react_agent._summarize_with_gemini("Acme makes anvils.", "Acme profile") == "Acme makes anvils."
+    finally:
+        react_agent._summary_stream.reset(token)
+
+    generate.assert_not_called()
+    assert queue.get_nowait() == ("Acme profile", "Acme makes anvils.")
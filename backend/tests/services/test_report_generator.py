@@ -0,0 +1,96 @@
+from collections import OrderedDict
+
+import pytest
+
+from src.services import report_generator
+
+
+async def _stream_chunks(mocker, texts):
+    for text in texts:
+        yield mocker.Mock(text=text)
+
+
+@pytest.mark.asyncio
+async def test_chat_responses_are_replayed_from_cache(mocker, monkeypatch):
+    monkeypatch.setattr(report_generator.llm_cache, "_local", OrderedDict())
+    chat = mocker.Mock()
+    chat.send_message_async = mocker.AsyncMock(side_effect=lambda *args, **kwargs: _stream_chunks(mocker, ["Acme ", "makes anvils."]))
+    model = mocker.Mock()
+    model.start_chat.return_value = chat
+    get_model = mocker.patch.object(report_generator, "_get_chat_model", return_value=model)
+    messages = [{"role": "user", "content": "What does Acme make?"}]
+
+    first = [event async for event in report_generator.generate_chat_response(messages, "report", False)]
+    second = [event async for event in report_generator.generate_chat_response(messages, "report", False)]
+    other = [event async for event in report_generator.generate_chat_response(messages, "another report", False)]
+
+    assert first == second == [{"type": "chunk", "payload": "Acme makes anvils."}]
+    assert other == first
+    assert model.start_chat.call_count == 2
+    assert [call.args for call in get_model.call_args_list] == [("report",), ("report",), ("another report",)]
+
+
+def test_chat_model_carries_the_report_context_as_a_shared_prefix(monkeypatch):
+    monkeypatch.setattr(report_generator, "_chat_models", OrderedDict())
+    model = report_generator._get_chat_model("Acme acquires Globex.")
+
+    assert report_generator._get_chat_model("Acme acquires Globex.") is model
+    assert "Acme acquires Globex." in model._system_instruction.parts[0].text
+    assert "Acme acquires Globex." not in report_generator._chat_models
+
+    for i in range(report_generator.CHAT_MODEL_CACHE_SIZE):
+        report_generator._get_chat_model(f"report {i}")
+    assert len(report_generator._chat_models) == report_generator.CHAT_MODEL_CACHE_SIZE
+    assert report_generator._get_chat_model("Acme acquires Globex.") is not model
+
+
+def test_taste_comparisons_skip_unnamed_items_and_cap_at_five():
+    acquirer = [{"name": f"a{i}"} for i in range(8)] + [{"name": "shared"}, {"id": "no-name"}]
+    target = [{"name": "shared"}, {"name": ""}, {"name": "t0"}]
+
+    clashes = report_generator.find_culture_clashes(acquirer, target)
+
+    assert report_generator.calculate_affinity_overlap(acquirer, target) == 10.0
+    assert [c["severity"] for c in clashes] == ["MEDIUM"] * 5 + ["HIGH"]
+    assert [o["description"].split("'")[1] for o in report_generator.find_untapped_growth(acquirer, target)] == ["shared"]
+
+
+@pytest.mark.asyncio
+async def test_long_chat_histories_keep_the_first_and_latest_turns(mocker, monkeypatch):
+    monkeypatch.setattr(report_generator.llm_cache, "_local", OrderedDict())
+    monkeypatch.setattr(report_generator, "CHAT_MAX_HISTORY_MESSAGES", 4)
+    chat = mocker.Mock()
+    chat.send_message_async = mocker.AsyncMock(side_effect=lambda *args, **kwargs: _stream_chunks(mocker, ["ok"]))
+    model = mocker.Mock()
+    model.start_chat.return_value = chat
+    mocker.patch.object(report_generator, "_get_chat_model", return_value=model)
+    messages = [{"role": "user" if i % 2 == 0 else "assistant", "content": f"m{i}"} for i in range(9)]
+
+    [event async for event in report_generator.generate_chat_response(messages, "report", False)]
+
+    history = model.start_chat.call_args.kwargs["history"]
+    assert [(turn["role"], turn["parts"][0]) for turn in history] == [("user", "m0"), ("model", "m5"), ("user", "m6"), ("model", "m7")]
+
+
+def test_taste_comparisons_short_circuit_without_overlap_or_data():
+    acquirer = [{"name": "a"}, {"name": "b"}]
+
+    assert report_generator.find_culture_clashes(acquirer, []) == []
+    assert report_generator.find_culture_clashes(acquirer, list(reversed(acquirer))) == []
+    assert report_generator.find_untapped_growth(acquirer, [{"name": "c"}]) == []
+
+
+@pytest.mark.asyncio
+async def test_chat_chunks_are_coalesced_until_the_flush_threshold(mocker, monkeypatch):
+    monkeypatch.setattr(report_generator.llm_cache, "_local", OrderedDict())
+    monkeypatch.setattr(report_generator, "CHAT_FLUSH_CHARS", 6)
+    monkeypatch.setattr(report_generator, "CHAT_FLUSH_INTERVAL", 60.0)
+    chat = mocker.Mock()
+    chat.send_message_async = mocker.AsyncMock(return_value=_stream_chunks(mocker, ["Ac", "me ", "makes", " anvils."]))
+    model = mocker.Mock()
+    model.start_chat.return_value = chat
+    mocker.patch.object(report_generator, "_get_chat_model", return_value=model)
+
+    events = [event async for event in report_generator.generate_chat_response([{"role": "user", "content": "q"}], "report", False)]
+
+    assert [event["payload"] for event in events] == ["Acme makes", " anvils."]
@@ -0,0 +1,49 @@
+from collections import OrderedDict
+
+import httpx
+import pytest
+
+from src.services import search
+
+
+@pytest.mark.asyncio
+async def test_web_search_reuses_one_client(monkeypatch):
+    monkeypatch.setattr(search.llm_cache, "_local", OrderedDict())
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(200, json={"results": [{"title": "Acme", "url": "https://acme.example", "content": "About Acme"}]})
+
+    client = httpx.AsyncClient(base_url=search.TAVILY_BASE_URL, transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(search, "_tavily_http", client)
+
+    first = await search.web_search("Acme profile")
+    await search.web_search("Acme culture")
+
+    assert first["sources"] == [{"title": "Acme", "url": "https://acme.example"}]
+    assert "Content: About Acme" in first["context_str"]
+    assert search._get_tavily_http() is client
+    assert [r.url.path for r in requests] == ["/search", "/search"]
+    await client.aclose()
+
+@pytest.mark.asyncio
+async def test_web_search_results_are_cached_by_normalized_query(monkeypatch):
+    monkeypatch.setattr(search.llm_cache, "_local", OrderedDict())
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        results = [] if b"Globex" in request.content else [{"title": "Acme", "url": "https://acme.example", "content": "About Acme"}]
+        return httpx.Response(200, json={"results": results})
+
+    client = httpx.AsyncClient(base_url=search.TAVILY_BASE_URL, transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(search, "_tavily_http", client)
+
+    first = await search.web_search("Acme profile")
+    assert await search.web_search("  acme   Profile ") == first
+    await search.web_search("Globex profile")
+    await search.web_search("Globex profile")
+
+    assert len(requests) == 3
+    await client.aclose()
@@ -2,7 +2,7 @@
 
 import React, { useState, useRef, useEffect } from "react";
 import * as TooltipPrimitive from "@radix-ui/react-tooltip";
-import { ArrowUp, Paperclip, X, Search, Bot, Database, BrainCircuit, CheckCircle, AlertTriangle, Link as LinkIcon, Sparkles, Loader2, Microscope, MessageSquareQuote, Zap, TrendingUp } from "lucide-react";
+import { ArrowUp, Paperclip, X, Search, Bot, Database, BrainCircuit, CheckCircle, AlertTriangle, Link as LinkIcon, Sparkles, Loader2, Microscope, MessageSquareQuote, Zap, TrendingUp, ChevronRight, FileText } from "lucide-react";
 import { cn } from "@/lib/utils";
 import { Button } from "../ui/button";
 import { Input } from "../ui/input";
@@ -29,7 +29,7 @@ const createDraftReport = async (url: string, { arg }: { arg: { token: string }}
 // TYPES
 interface Step {
   id: string;
-  status: 'info' | 'search' | 'source' | 'analysis' | 'reasoning' | 'synthesis' | 'saving' | 'complete' | 'error' | 'qloo_insight';
+  status: 'info' | 'search' | 'source' | 'sources_batch' | 'analysis' | 'reasoning' | 'synthesis' | 'saving' | 'complete' | 'error' | 'qloo_insight' | 'planned_tool' | 'cache_hit' | 'summary_chunk' | 'summary';
   message?: string;
   payload?: any;
 }
@@ -117,7 +117,10 @@ const StepItem = ({ step }: { step: Step }) => {
         saving: <Database className="h-4 w-4 text-green-500" />,
         complete: <CheckCircle className="h-4 w-4 text-green-500" />,
         error: <AlertTriangle className="h-4 w-4 text-destructive" />,
-        qloo_insight: <Sparkles className="h-4 w-4 text-purple-400"/>
+        qloo_insight: <Sparkles className="h-4 w-4 text-purple-400"/>,
+        planned_tool: <ChevronRight className="h-4 w-4 text-primary" />,
+        cache_hit: <Zap className="h-4 w-4 text-yellow-500" />,
+        summary: <FileText className="h-4 w-4 text-muted-foreground" />
     };
 
     const renderContent = () => {
@@ -132,7 +135,8 @@ const StepItem = ({ step }: { step: Step }) => {
             <div className="flex-shrink-0 mt-0.5">{ICONS[step.status] || <Sparkles className="h-4 w-4" />}</div>
             <div className={cn("flex-grow", 
                 step.status === 'error' && "text-destructive font-medium",
-                step.status === 'reasoning' && "text-muted-foreground italic"
+                step.status === 'reasoning' && "text-muted-foreground italic",
+                step.status === 'summary' && "text-muted-foreground line-clamp-3"
             )}>{renderContent()}</div>
         </motion.div>
     );
@@ -223,6 +227,16 @@ export const PromptInputBox = React.forwardRef<HTMLDivElement, PromptInputBoxPro
                         
                         if (newStep.status === 'source') { 
                             setSources(prev => [...prev, newStep]); 
+                        } else if (newStep.status === 'sources_batch') {
+                            const batch: Step[] = (newStep.payload || []).map((source: any, i: number) => ({ id: `${newStep.id}-${i}`, status: 'source', payload: source }));
+                            setSources(prev => [...prev, ...batch]);
+                        } else if (newStep.status === 'summary_chunk') {
+                            // Deltas of one search summary grow a single step instead of adding one per chunk.
+                            const { query, delta } = newStep.payload || {};
+                            const summaryId = `summary-${query}`;
+                            setLogSteps(prev => prev.some(step => step.id === summaryId)
+                                ? prev.map(step => step.id === summaryId ? { ...step, message: (step.message || "") + delta } : step)
+                                : [...prev, { id: summaryId, status: 'summary', message: delta }]);
                         } else if (newStep.status === 'qloo_insight') {
                             setQlooInsights(newStep.payload);
                             setLogSteps(prev => [...prev, { ...newStep, message: "Qloo analysis complete." }]);